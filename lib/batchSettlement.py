@@ -0,0 +1,161 @@
+import os
+from datetime import datetime
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                               QLineEdit, QPushButton, QListWidget, QMessageBox, QFileDialog)
+from PySide6.QtCore import QThreadPool
+from PySide6.QtPrintSupport import QPrinter, QPrintDialog
+from PySide6.QtGui import QTextDocument, QPageSize, QPageLayout
+from lib.ledgerRepository import get_repository
+from lib.ledgerIndex import month_bounds
+from lib.rentEntry import format_rent
+from lib.statementRender import combine_for_print, statement_file_names
+from lib.pdfStatement import write_statement_pdfs
+from lib.statementWorker import BatchStatementWorker
+
+class BatchSettlementDialog(QDialog):
+    """批次月結：一次產生某位所有人當月所有客戶的租金應收付明細表"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.repository = get_repository()
+        self.documents = []
+        self.worker = None
+        self.setWindowTitle("批次月結")
+        self.resize(600, 500)
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+
+        # 公司所有人
+        self.owner_input = QComboBox()
+        self.owner_input.setEditable(True)
+        self.owner_input.addItems(sorted(self.repository.names()))
+        layout.addWidget(QLabel("公司所有人："))
+        layout.addWidget(self.owner_input)
+
+        # 年、月
+        today = datetime.today()
+        self.year_input = QComboBox()
+        self.year_input.addItems([str(year) for year in range(2020, 2031)])
+        self.year_input.setCurrentText(str(today.year))
+        self.month_input = QComboBox()
+        self.month_input.addItems([str(month) for month in range(1, 13)])
+        self.month_input.setCurrentText(str(today.month))
+        date_layout = QHBoxLayout()
+        date_layout.addWidget(QLabel("年份："))
+        date_layout.addWidget(self.year_input)
+        date_layout.addWidget(QLabel("月份："))
+        date_layout.addWidget(self.month_input)
+        layout.addLayout(date_layout)
+
+        # 服務費用
+        self.service_fee_input = QLineEdit()
+        self.service_fee_input.setPlaceholderText("輸入服務費用")
+        layout.addWidget(QLabel("服務費用："))
+        layout.addWidget(self.service_fee_input)
+
+        self.generate_btn = QPushButton("產生明細表")
+        self.generate_btn.clicked.connect(self.generate)
+        layout.addWidget(self.generate_btn)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        self.result_list = QListWidget()
+        layout.addWidget(self.result_list)
+
+        btn_layout = QHBoxLayout()
+        self.save_btn = QPushButton("儲存 HTML")
+        self.save_btn.clicked.connect(self.save_html)
+        self.pdf_btn = QPushButton("儲存 PDF")
+        self.pdf_btn.clicked.connect(self.save_pdf)
+        self.print_btn = QPushButton("全部列印")
+        self.print_btn.clicked.connect(self.print_all)
+        for button in (self.save_btn, self.pdf_btn, self.print_btn):
+            button.setEnabled(False)
+            btn_layout.addWidget(button)
+        layout.addLayout(btn_layout)
+
+    def generate(self):
+        owner = self.owner_input.currentText().strip()
+        if not owner:
+            QMessageBox.warning(self, "輸入錯誤", "所有人不可為空白")
+            return
+        try:
+            service_fee = int(self.service_fee_input.text()) if self.service_fee_input.text().strip() else 0
+        except ValueError:
+            service_fee = 0
+        year = self.year_input.currentText()
+        month = self.month_input.currentText()
+        # 資料在主執行緒載入，背景執行緒只讀取已載入的月份
+        try:
+            self.repository.load_range(*month_bounds(year, month))
+        except Exception as e:
+            self.show_failed(str(e))
+            return
+
+        self.generate_btn.setEnabled(False)
+        for button in (self.save_btn, self.pdf_btn, self.print_btn):
+            button.setEnabled(False)
+        self.result_list.clear()
+        self.status_label.setText("計算中...")
+        self.worker = BatchStatementWorker(self.repository, owner, year, month, service_fee,
+                                           datetime.today().strftime("%Y/%m/%d"))
+        self.worker.signals.finished.connect(self.show_documents)
+        self.worker.signals.failed.connect(self.show_failed)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def show_documents(self, documents):
+        self.documents = documents
+        self.generate_btn.setEnabled(True)
+        self.status_label.setText(f"共 {len(documents)} 位客戶")
+        for name, statement, _, _ in documents:
+            self.result_list.addItem(f"{name}：承租 {format_rent(statement.user_sum)} 元，出租 {format_rent(statement.owner_sum)} 元")
+        for button in (self.save_btn, self.pdf_btn, self.print_btn):
+            button.setEnabled(bool(documents))
+
+    def show_failed(self, message):
+        self.generate_btn.setEnabled(True)
+        self.status_label.setText(f"產生失敗: {message}")
+
+    def save_html(self):
+        folder = QFileDialog.getExistingDirectory(self, "選擇儲存資料夾")
+        if not folder:
+            return
+        for file_name, (_, _, _, html) in zip(self.file_names(), self.documents):
+            path = os.path.join(folder, f"{file_name}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(html)
+        QMessageBox.information(self, "成功", f"已儲存 {len(self.documents)} 份明細表")
+
+    def save_pdf(self):
+        """不經列印對話框，直接把每位客戶的明細表寫成 PDF"""
+        folder = QFileDialog.getExistingDirectory(self, "選擇儲存資料夾")
+        if not folder:
+            return
+        try:
+            write_statement_pdfs(folder, [(file_name, job) for file_name, (_, _, job, _)
+                                          in zip(self.file_names(), self.documents)])
+        except Exception as e:
+            QMessageBox.critical(self, "錯誤", f"PDF 儲存失敗: {e}")
+            return
+        QMessageBox.information(self, "成功", f"已儲存 {len(self.documents)} 份 PDF 明細表")
+
+    def file_names(self):
+        return statement_file_names(self.month_key(), [name for name, _, _, _ in self.documents])
+
+    def month_key(self):
+        return f"{int(self.year_input.currentText()):04d}-{int(self.month_input.currentText()):02d}"
+
+    def print_all(self):
+        """全部明細表合併成一份文件，只開一次列印對話框"""
+        document = QTextDocument()
+        document.setHtml(combine_for_print([html for _, _, _, html in self.documents]))
+
+        printer = QPrinter(QPrinter.HighResolution)
+        printer.setPageSize(QPageSize(QPageSize.A4))
+        printer.setPageOrientation(QPageLayout.Portrait)
+
+        dialog = QPrintDialog(printer, self)
+        if dialog.exec() == QPrintDialog.Accepted:
+            document.print_(printer)
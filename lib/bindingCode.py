@@ -3,14 +3,14 @@ from PySide6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QTabWidget, QWidget
 )
 from PySide6.QtCore import Qt
-import json
-import os
+from lib.ledgerRepository import get_repository
 
 class NameBindingDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("綁定設定")
         self.resize(450, 350)
+        self.repository = get_repository()
 
         layout = QVBoxLayout(self)
 
@@ -51,8 +51,7 @@ class NameBindingDialog(QDialog):
         table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(table)
 
-        bindings_path = os.path.join("resources", "jsonData", file_name)
-        bindings = self.load_bindings(bindings_path)
+        bindings = self.repository.bindings[file_name]
 
         def refresh_table():
             table.setRowCount(0)
@@ -81,23 +80,12 @@ class NameBindingDialog(QDialog):
                 refresh_table()
 
         def save():
-            os.makedirs(os.path.dirname(bindings_path), exist_ok=True)
-            with open(bindings_path, "w", encoding="utf-8") as f:
-                json.dump(bindings, f, ensure_ascii=False, indent=2)
+            self.repository.save_bindings(file_name)
 
         add_button.clicked.connect(add_binding)
         refresh_table()
         layout.save = save  # 將保存函數掛載在 layout 上，供 closeEvent 使用
 
-    def load_bindings(self, path):
-        if os.path.exists(path):
-            try:
-                with open(path, encoding="utf-8") as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-
     def closeEvent(self, event):
         # 分別呼叫每頁的 save 方法
         if hasattr(self.name_layout, "save"):
@@ -0,0 +1,237 @@
+"""不開啟視窗的月結命令列，供伺服器或排程使用：
+
+    python -m lib.cli statement --month 2025-03 --owner X --all-users --out dir/
+    python -m lib.cli statement --month 2025-03 --owner X --user Y --format pdf --out Y.pdf
+    python -m lib.cli person --name X --format csv
+
+計算與 RentSummaryPreview、PersonSummaryDialog 相同，不載入 QtWidgets"""
+import argparse
+import csv
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from datetime import datetime
+from lib.ledgerStore import DATA_DIR, close_ledger_stores
+from lib.ledgerRepository import LedgerRepository
+from lib.ledgerIndex import month_bounds
+from lib.rentEntry import format_rent
+from lib.settlement import HEADERS, compute_statement, settlement_text, person_summary
+from lib.statementRender import statement_jobs, statement_file_names
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+# 參數錯誤，由 argparse 結束程式
+EXIT_USAGE = 2
+# 資料驗證失敗：找不到指定的人、資料列格式錯誤或名稱綁定有循環
+EXIT_INVALID = 3
+
+FORMATS = ("json", "csv", "pdf")
+
+def parse_month(text):
+    try:
+        value = datetime.strptime(text, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"月份格式應為 YYYY-MM: {text!r}")
+    return value.year, value.month
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m lib.cli", description="租金月結命令列")
+    parser.add_argument("--data-dir", default=DATA_DIR, help=f"帳本資料夾（預設 {DATA_DIR}）")
+    parser.add_argument("--allow-invalid", action="store_true",
+                        help="資料列驗證失敗時仍以 0 結束（錯誤訊息照常輸出）")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    statement = commands.add_parser("statement", help="租金應收付明細表")
+    statement.add_argument("--month", required=True, type=parse_month, help="YYYY-MM")
+    statement.add_argument("--owner", required=True, help="公司所有人")
+    users = statement.add_mutually_exclusive_group(required=True)
+    users.add_argument("--user", help="客戶")
+    users.add_argument("--all-users", action="store_true", help="所有與所有人有往來的客戶")
+    statement.add_argument("--fee", type=int, default=0, help="服務費用（元）")
+    statement.add_argument("--format", choices=FORMATS, default="json")
+    statement.add_argument("--out", help="輸出檔案；--all-users 時為資料夾，每位客戶一個檔案")
+    statement.add_argument("--processes", action="store_true",
+                           help="--all-users 輸出 PDF 時分散到多個行程排版")
+
+    person = commands.add_parser("person", help="個人收支總結")
+    person.add_argument("--name", required=True, help="人員名稱或代號")
+    person.add_argument("--format", choices=("json", "csv"), default="json")
+    person.add_argument("--out", help="輸出檔案，省略時輸出到標準輸出")
+    return parser
+
+def amount(cents):
+    """以分為單位的整數轉為 JSON 數值"""
+    return cents // 100 if cents % 100 == 0 else cents / 100
+
+def statement_dict(statement, job, month_key):
+    owner_name, user_name, date_range, print_date, _, text = job
+
+    def lines(side):
+        return [dict(zip(("date", "weekday", "market", "rent"), line)) for line in side]
+
+    return {
+        "owner": owner_name,
+        "user": user_name,
+        "month": month_key,
+        "date_range": date_range,
+        "print_date": print_date,
+        "user_lines": lines(statement.user_lines),
+        "owner_lines": lines(statement.owner_lines),
+        "user_sum": amount(statement.user_sum),
+        "owner_sum": amount(statement.owner_sum),
+        "owner_total": amount(statement.owner_total),
+        "settlement": text,
+    }
+
+def statement_csv_rows(statement):
+    """與明細表相同的八欄，最後一列為兩側合計"""
+    rows = [HEADERS] + statement.rows()
+    rows.append(["合計", "", "", format_rent(statement.user_sum),
+                 "合計", "", "", format_rent(statement.owner_sum)])
+    return rows
+
+def person_dict(summary):
+    def lines(side):
+        return [{"date": date_str, "market": market, "rent": amount(rent)} for date_str, market, rent in side]
+
+    return {
+        "name": summary.name,
+        "total_income": amount(summary.total_income),
+        "total_expense": amount(summary.total_expense),
+        "net_income": amount(summary.net_income),
+        "income_lines": lines(summary.income_lines),
+        "expense_lines": lines(summary.expense_lines),
+    }
+
+def person_csv_rows(summary):
+    rows = [["類別", "日期", "市場", "租金"]]
+    rows.extend(["收入", date_str, market, format_rent(rent)] for date_str, market, rent in summary.income_lines)
+    rows.extend(["支出", date_str, market, format_rent(rent)] for date_str, market, rent in summary.expense_lines)
+    rows.append(["收入合計", "", "", format_rent(summary.total_income)])
+    rows.append(["支出合計", "", "", format_rent(summary.total_expense)])
+    rows.append(["淨收入", "", "", format_rent(summary.net_income)])
+    return rows
+
+def write_output(path, stdout, write):
+    """write(f) 寫到檔案；path 為空時寫到標準輸出"""
+    if not path:
+        write(stdout)
+        return
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    # CSV 以 utf-8-sig 存檔，Excel 開啟時中文才不會亂碼
+    encoding = "utf-8-sig" if path.endswith(".csv") else "utf-8"
+    with open(path, "w", encoding=encoding, newline="") as f:
+        write(f)
+    print(f"✅ 資料已儲存至 {path}")
+
+def write_json(path, stdout, data):
+    def write(f):
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    write_output(path, stdout, write)
+
+def write_csv(path, stdout, rows):
+    write_output(path, stdout, lambda f: csv.writer(f).writerows(rows))
+
+def run_statement(args, repository, stdout):
+    year, month = args.month
+    month_key = f"{year:04d}-{month:02d}"
+    print_date = datetime.today().strftime("%Y/%m/%d")
+
+    if args.all_users:
+        documents = statement_jobs(repository, args.owner, year, month, args.fee, print_date)
+    else:
+        # 與 RentSummaryPreview 相同：逐月計算，再加上服務費的收付款說明
+        first_day, last_day = month_bounds(year, month)
+        statement = compute_statement(repository, args.user, first_day, last_day)
+        owner_name = repository.resolve_name(args.owner)
+        user_name = repository.resolve_name(args.user)
+        text = settlement_text(args.owner, owner_name, args.user, args.fee, statement.owner_total)
+        date_range = f"{first_day.strftime('%Y/%m/%d')} 到 {last_day.strftime('%Y/%m/%d')}"
+        documents = [(user_name, statement, (owner_name, user_name, date_range, print_date, statement.rows(), text))]
+
+    missing = [name for name in [args.owner] + ([] if args.all_users else [args.user])
+               if repository.resolver.lookup_id(name) == -1]
+    for name in missing:
+        print(f"❌ {month_key} 沒有 {name} 的帳目", file=sys.stderr)
+
+    if args.all_users:
+        file_names = statement_file_names(month_key, [name for name, _, _ in documents])
+        if args.format == "json" and not args.out:
+            write_json(None, stdout, [statement_dict(statement, job, month_key) for _, statement, job in documents])
+        elif args.format == "pdf":
+            from lib.pdfStatement import write_statement_pdfs
+            named_jobs = list(zip(file_names, [job for _, _, job in documents]))
+            for path in write_statement_pdfs(args.out, named_jobs, processes=args.processes):
+                print(f"✅ 資料已儲存至 {path}")
+        else:
+            for file_name, (_, statement, job) in zip(file_names, documents):
+                path = os.path.join(args.out, f"{file_name}.{args.format}")
+                if args.format == "json":
+                    write_json(path, stdout, statement_dict(statement, job, month_key))
+                else:
+                    write_csv(path, stdout, statement_csv_rows(statement))
+    else:
+        _, statement, job = documents[0]
+        if args.format == "pdf":
+            from lib.pdfStatement import write_statement_pdf
+            folder = os.path.dirname(args.out)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            write_statement_pdf(args.out, *job)
+            print(f"✅ 資料已儲存至 {args.out}")
+        elif args.format == "json":
+            write_json(args.out, stdout, statement_dict(statement, job, month_key))
+        else:
+            write_csv(args.out, stdout, statement_csv_rows(statement))
+    return bool(missing)
+
+def run_person(args, repository, stdout):
+    summary = person_summary(repository, args.name)
+    missing = repository.resolver.lookup_id(args.name) == -1
+    if missing:
+        print(f"❌ 找不到 {args.name} 的帳目", file=sys.stderr)
+    if args.format == "json":
+        write_json(args.out, stdout, person_dict(summary))
+    else:
+        write_csv(args.out, stdout, person_csv_rows(summary))
+    return missing
+
+def report_invalid(repository):
+    """已載入資料中的格式錯誤與名稱綁定循環，分別回傳是否有資料列錯誤、是否有循環"""
+    invalid = repository.invalid_rows()
+    for source, date_str, index, error in invalid:
+        print(f"❌ {source} {date_str} 第 {index + 1} 列: {error}", file=sys.stderr)
+    # 名稱綁定的循環在建立 NameResolver 時已印出
+    return bool(invalid), bool(repository.resolver.cycles)
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "statement" and args.format != "json" and not args.out:
+        if args.all_users:
+            parser.error("--all-users 搭配 csv 或 pdf 時需指定 --out 資料夾")
+        if args.format == "pdf":
+            parser.error("pdf 格式需指定 --out 檔案")
+    stdout = sys.stdout
+    commands = {"statement": run_statement, "person": run_person}
+    try:
+        # 標準輸出只留給 JSON/CSV 結果，進度與警告訊息改寫到標準錯誤
+        with redirect_stdout(sys.stderr):
+            repository = LedgerRepository(args.data_dir)
+            missing = commands[args.command](args, repository, stdout)
+            rows_invalid, cycles = report_invalid(repository)
+            # --allow-invalid 只放行資料列錯誤，名稱綁定循環一律視為失敗
+            invalid = (rows_invalid and not args.allow_invalid) or cycles
+    except Exception as e:
+        print(f"❌ 月結失敗: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        close_ledger_stores()
+    return EXIT_INVALID if missing or invalid else EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
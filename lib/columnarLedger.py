@@ -0,0 +1,84 @@
+from array import array
+from datetime import date
+
+class StringTable:
+    """字串字典編碼：相同字串只存一份，欄位中只存整數代碼"""
+
+    __slots__ = ("strings", "codes")
+
+    def __init__(self):
+        self.strings = []
+        self.codes = {}
+
+    def code(self, text):
+        code = self.codes.get(text)
+        if code is None:
+            code = len(self.strings)
+            self.codes[text] = code
+            self.strings.append(text)
+        return code
+
+    def lookup(self, text):
+        """查詢既有代碼，不存在時回傳 -1"""
+        return self.codes.get(text, -1)
+
+    def __getitem__(self, code):
+        return self.strings[code]
+
+    def __len__(self):
+        return len(self.strings)
+
+class ColumnarLedger:
+    """以連續陣列儲存的帳本，依日期排序：
+    日期序數 int32、租金（分）int64，市場、備註為字串表代碼 int32，
+    所有人與使用人為 NameResolver 配發的人員代號 int32，比對時只需比較整數"""
+
+    def __init__(self):
+        self.dates = array("i")
+        self.rents = array("q")
+        self.markets = array("i")
+        self.owners = array("i")
+        self.users = array("i")
+        self.notes = array("i")
+        # 市場、租金、所有人、使用人皆有填寫者為 1
+        self.complete = array("b")
+        self.market_table = StringTable()
+        self.note_table = StringTable()
+
+    @classmethod
+    def from_entries(cls, sources):
+        """由 {日期: [RentEntry]} 的多個來源建立，人員代號取自已填好的 owner_id / user_id；
+        同一天內保留來源與資料列原本的順序。租金空白或無法解析的資料列不納入"""
+        days = {}
+        for entries_by_date in sources:
+            for date_str, entries in entries_by_date.items():
+                days.setdefault(date_str, []).extend(entries)
+
+        ledger = cls()
+        market_code = ledger.market_table.code
+        note_code = ledger.note_table.code
+        for date_str in sorted(days):
+            try:
+                ordinal = date.fromisoformat(date_str).toordinal()
+            except ValueError:
+                continue
+            for entry in days[date_str]:
+                if entry.rent is None:
+                    continue
+                ledger.dates.append(ordinal)
+                ledger.rents.append(entry.rent)
+                ledger.markets.append(market_code(entry.market))
+                ledger.owners.append(entry.owner_id)
+                ledger.users.append(entry.user_id)
+                ledger.notes.append(note_code(entry.note))
+                ledger.complete.append(1 if entry.market and entry.owner and entry.user else 0)
+        return ledger
+
+    def __len__(self):
+        return len(self.dates)
+
+    def date_of(self, i):
+        return date.fromordinal(self.dates[i])
+
+    def market_of(self, i):
+        return self.market_table[self.markets[i]]
@@ -0,0 +1,52 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QStyledItemDelegate
+
+HEADERS = ["市場", "租金", "所有人", "使用人", "備註"]
+
+class DateRowModel(QAbstractTableModel):
+    """日期資料檢視中半邊的唯讀模型；offset 為第一列在當天資料中的位置，用來決定底色"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.offset = 0
+
+    def load(self, rows, offset=0):
+        self.beginResetModel()
+        self.rows = rows
+        self.offset = offset
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            row = self.rows[index.row()]
+            return str(row[index.column()]) if index.column() < len(row) else ""
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+class AlternateRowDelegate(QStyledItemDelegate):
+    """依資料列在當天的位置交替繪製底色，不必替每格設定樣式表"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.color = QColor("#f0f0f0")
+
+    def paint(self, painter, option, index):
+        if (index.model().offset + index.row()) % 2 == 0:
+            painter.fillRect(option.rect, self.color)
+        super().paint(painter, option, index)
@@ -1,18 +1,22 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
-    QCalendarWidget, QScrollArea, QGridLayout, QFrame, QSizePolicy
+    QCalendarWidget, QFrame, QSizePolicy, QTableView, QHeaderView, QAbstractItemView
 )
 from PySide6.QtCore import QDate, Qt
 from PySide6.QtGui import QFont
-from lib.func import load_json
+from lib.ledgerStore import source_name
+from lib.ledgerRepository import get_repository
+from lib.ledgerWatcher import get_ledger_watcher
+from lib.dateRowModel import DateRowModel, AlternateRowDelegate
 
 class DateViewer(QWidget):
     def __init__(self, data_path, parent=None):
         super().__init__(parent)
         self.data_path = data_path
-        self.data = load_json(data_path)
+        self.repository = get_repository()
+        self.source = source_name(data_path)
         self.initUI()
-        self.resizeEvent = self.onResize
+        get_ledger_watcher().dataChanged.connect(self.onLedgerChanged)
 
     def initUI(self):
         self.setWindowTitle("日期資料檢視")
@@ -40,105 +44,55 @@ class DateViewer(QWidget):
         calendar_layout.addWidget(self.calendar, 0, Qt.AlignCenter)
         main_layout.addWidget(calendar_container)
         
-        # Single scroll area for both columns
-        self.scroll = QScrollArea()
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        
-        self.data_container = QWidget()
-        self.grid_layout = QGridLayout(self.data_container)
-        self.grid_layout.setContentsMargins(10, 10, 10, 10)
-        
-        # Set initial column widths and spacing
-        self.updateColumnWidths()
-        self.grid_layout.setHorizontalSpacing(10)
-        self.grid_layout.setVerticalSpacing(5)
-        
-        # Set size policies
-        self.data_container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        # Two model/view tables side by side; only visible cells are painted
+        tables_container = QWidget()
+        tables_layout = QHBoxLayout(tables_container)
+        tables_layout.setContentsMargins(10, 10, 10, 10)
+        tables_layout.setSpacing(10)
+
+        header_font = QFont("Arial", 10, QFont.Bold)
+        self.left_model = DateRowModel(self)
+        self.right_model = DateRowModel(self)
+        self.left_table = self.createTable(self.left_model, header_font)
+        self.right_table = self.createTable(self.right_model, header_font)
+
+        divider = QFrame()
+        divider.setFrameShape(QFrame.VLine)
+        divider.setFrameShadow(QFrame.Sunken)
+
+        tables_layout.addWidget(self.left_table)
+        tables_layout.addWidget(divider)
+        tables_layout.addWidget(self.right_table)
+
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.scroll.setWidget(self.data_container)
-        main_layout.addWidget(self.scroll)
+        main_layout.addWidget(tables_container)
         
         # Load initial data
         self.loadData()
 
-    def updateColumnWidths(self):
-        width = self.width()
-        self.column_width = max(100, width // 12)
-        
-        for i in range(5):  # 5 columns per side
-            self.grid_layout.setColumnMinimumWidth(i, self.column_width)
-            self.grid_layout.setColumnMinimumWidth(i + 5, self.column_width)
-            self.grid_layout.setColumnStretch(i, 1)
-            self.grid_layout.setColumnStretch(i + 5, 1)
+    def createTable(self, model, header_font):
+        table = QTableView()
+        table.setModel(model)
+        table.setItemDelegate(AlternateRowDelegate(table))
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setShowGrid(False)
+        table.verticalHeader().hide()
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        # Stretch columns are laid out by the header itself, nothing to redo on resize
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.horizontalHeader().setFont(header_font)
+        table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        return table
 
-    def onResize(self, event):
-        self.updateColumnWidths()
-        event.accept()
+    def onLedgerChanged(self, changed):
+        if self.source in changed:
+            self.loadData()
 
     def loadData(self):
-        # Clear existing data
-        for i in reversed(range(self.grid_layout.count())): 
-            self.grid_layout.itemAt(i).widget().setParent(None)
-            
         date_str = self.calendar.selectedDate().toString("yyyy-MM-dd")
-        if date_str not in self.data:
-            return
-            
-        # Add headers
-        headers = ["市場", "租金", "所有人", "使用人", "備註"]
-        header_font = QFont("Arial", 10, QFont.Bold)
-        
-        # Add column dividers and headers
-        for i, header in enumerate(headers):
-            # Left column header
-            left_header = QLabel(header)
-            left_header.setFont(header_font)
-            left_header.setAlignment(Qt.AlignCenter)
-            self.grid_layout.addWidget(left_header, 0, i)
-            
-            # Right column header
-            right_header = QLabel(header)
-            right_header.setFont(header_font)
-            right_header.setAlignment(Qt.AlignCenter)
-            self.grid_layout.addWidget(right_header, 0, i + 5)
-            
-            # Add vertical divider
-            if i == 4:
-                divider = QFrame()
-                divider.setFrameShape(QFrame.VLine)
-                divider.setFrameShadow(QFrame.Sunken)
-                self.grid_layout.addWidget(divider, 0, 5, -1, 1)
-            
-        # Add data with styling
-        row_data = self.data[date_str]
+        row_data = self.repository.rows(self.source, date_str)
+
+        # First half on the left, the rest on the right
         half_length = len(row_data) // 2
-        
-        # Left column data
-        for row_idx in range(half_length):
-            row = row_data[row_idx]
-            for col_idx, value in enumerate(row):
-                label = QLabel(str(value))
-                label.setAlignment(Qt.AlignCenter)
-                label.setStyleSheet("padding: 5px;")
-                
-                # Alternate row background
-                if row_idx % 2 == 0:
-                    label.setStyleSheet("background-color: #f0f0f0; padding: 5px;")
-                
-                self.grid_layout.addWidget(label, row_idx + 1, col_idx, Qt.AlignCenter)
-        
-        # Right column data
-        for row_idx in range(half_length, len(row_data)):
-            row = row_data[row_idx]
-            for col_idx, value in enumerate(row):
-                label = QLabel(str(value))
-                label.setAlignment(Qt.AlignCenter)
-                label.setStyleSheet("padding: 5px;")
-                
-                # Alternate row background
-                if row_idx % 2 == 0:
-                    label.setStyleSheet("background-color: #f0f0f0; padding: 5px;")
-                
-                self.grid_layout.addWidget(label, row_idx - half_length + 1, col_idx + 5, Qt.AlignCenter)
+        self.left_model.load(row_data[:half_length])
+        self.right_model.load(row_data[half_length:], half_length)
@@ -0,0 +1,94 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import QStyledItemDelegate, QLineEdit
+
+FIELD_COUNT = 5
+DELETE_COLUMN = FIELD_COUNT
+
+class DayRowModel(QAbstractTableModel):
+    """主視窗當天資料列的模型：前五欄為市場、租金、所有人、使用人、備註，可直接編輯；
+    最後一欄為刪除按鈕。換日時整個重設，畫面只為看得到的列建立編輯器"""
+
+    edited = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.delete_icon = QIcon(":/images/x.png")
+
+    def load(self, rows):
+        """換日時重設為該日的資料列（複製一份，編輯時不改動共用資料）"""
+        self.beginResetModel()
+        self.rows = [self.normalize(row) for row in rows]
+        self.endResetModel()
+
+    @staticmethod
+    def normalize(row):
+        values = [str(v) for v in row[:FIELD_COUNT]] if isinstance(row, list) else []
+        values.extend([""] * (FIELD_COUNT - len(values)))
+        return values
+
+    def append_rows(self, rows):
+        """一次插入多列，只通知畫面一次；回傳第一列的列號"""
+        first = len(self.rows)
+        if rows:
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self.rows.extend(self.normalize(row) for row in rows)
+            self.endInsertRows()
+            self.edited.emit()
+        return first
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.rows[row]
+        self.endRemoveRows()
+        self.edited.emit()
+
+    def values(self):
+        return [list(row) for row in self.rows]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else FIELD_COUNT + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if column == DELETE_COLUMN:
+            if role == Qt.DecorationRole:
+                return self.delete_icon
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.rows[index.row()][column]
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() == DELETE_COLUMN:
+            return False
+        value = str(value)
+        row = self.rows[index.row()]
+        if row[index.column()] == value:
+            return False
+        row[index.column()] = value
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        self.edited.emit()
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.column() == DELETE_COLUMN:
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+class DayRowDelegate(QStyledItemDelegate):
+    """每輸入一個字就寫回模型，與原本逐列 QLineEdit 的行為相同，換日存檔時不會漏掉正在編輯的內容"""
+
+    def createEditor(self, parent, option, index):
+        editor = super().createEditor(parent, option, index)
+        if isinstance(editor, QLineEdit):
+            editor.textEdited.connect(lambda _, e=editor: self.commitData.emit(e))
+        return editor
@@ -1,18 +1,22 @@
-import json
-import os
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QCalendarWidget, QMessageBox, QCheckBox, QDateEdit, QListWidget
+    QCalendarWidget, QMessageBox, QCheckBox, QDateEdit, QTableView, QHeaderView, QAbstractItemView,
+    QInputDialog
 )
+from datetime import date
 from PySide6.QtCore import Qt, QDate
+from lib.ledgerRepository import get_repository
+from lib.ledgerWatcher import get_ledger_watcher
+from lib.fixedRentModel import FixedRentTableModel, FixedRentFilterProxy
+from lib.rentEntry import parse_rent
+from lib.rentRule import RentRule
 
 class FixedRentEditor(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("固定位租修改")
         self.resize(800, 600)
-        self.data_path = "resources/jsonData/fixedRentData.json"
-        self.data_dict = {}
+        self.repository = get_repository()
         self.selected_dates = []
 
         self.main_layout = QVBoxLayout(self)
@@ -97,14 +101,60 @@ class FixedRentEditor(QWidget):
         self.main_layout.addWidget(repeat_widget)
 
         # 固定位租列表
-        self.fixed_rent_list = QListWidget()
+        self.fixed_rent_model = FixedRentTableModel(self.repository, self)
+        self.fixed_rent_proxy = FixedRentFilterProxy(self)
+        self.fixed_rent_proxy.setSourceModel(self.fixed_rent_model)
         self.main_layout.addWidget(QLabel("已設定的固定位租:"))
-        self.main_layout.addWidget(self.fixed_rent_list)
+
+        # 篩選列
+        filter_widget = QWidget()
+        filter_layout = QHBoxLayout(filter_widget)
+        for label, column in (("市場:", 1), ("所有人:", 3), ("使用人:", 4)):
+            filter_layout.addWidget(QLabel(label))
+            filter_input = QLineEdit()
+            filter_input.textChanged.connect(lambda text, column=column: self.fixed_rent_proxy.setTextFilter(column, text))
+            filter_layout.addWidget(filter_input)
+        self.date_filter_check = QCheckBox("日期:")
+        self.filter_start_date = QDateEdit(QDate.currentDate())
+        self.filter_end_date = QDateEdit(QDate.currentDate().addMonths(1))
+        self.date_filter_check.toggled.connect(self.updateDateFilter)
+        self.filter_start_date.dateChanged.connect(self.updateDateFilter)
+        self.filter_end_date.dateChanged.connect(self.updateDateFilter)
+        filter_layout.addWidget(self.date_filter_check)
+        filter_layout.addWidget(self.filter_start_date)
+        filter_layout.addWidget(QLabel("至"))
+        filter_layout.addWidget(self.filter_end_date)
+        self.main_layout.addWidget(filter_widget)
+
+        # 只繪製看得到的列，可多選後一次刪除
+        self.fixed_rent_table = QTableView()
+        self.fixed_rent_table.setModel(self.fixed_rent_proxy)
+        self.fixed_rent_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.fixed_rent_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.fixed_rent_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.fixed_rent_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.fixed_rent_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.fixed_rent_table.verticalHeader().hide()
+        self.main_layout.addWidget(self.fixed_rent_table)
         
         # 刪除按鈕
         self.delete_btn = QPushButton("刪除選中項目")
         self.delete_btn.clicked.connect(self.deleteSelectedFixedRent)
         self.main_layout.addWidget(self.delete_btn)
+
+        # 系列操作：同一次設定產生的固定位租為一個系列
+        series_widget = QWidget()
+        series_layout = QHBoxLayout(series_widget)
+        self.change_series_btn = QPushButton("自選中日期起修改租金")
+        self.change_series_btn.clicked.connect(self.changeSelectedSeries)
+        series_layout.addWidget(self.change_series_btn)
+        self.end_series_btn = QPushButton("系列結束於選中日期")
+        self.end_series_btn.clicked.connect(self.endSelectedSeries)
+        series_layout.addWidget(self.end_series_btn)
+        self.delete_series_btn = QPushButton("刪除整個系列")
+        self.delete_series_btn.clicked.connect(self.deleteSelectedSeries)
+        series_layout.addWidget(self.delete_series_btn)
+        self.main_layout.addWidget(series_widget)
         
         # 控制列（關閉按鈕）
         self.button_row = QWidget()
@@ -119,32 +169,31 @@ class FixedRentEditor(QWidget):
         
         # 初始載入資料
         self.loadFixedRentData()
+        get_ledger_watcher().dataChanged.connect(self.onLedgerChanged)
+
+    def onLedgerChanged(self, changed):
+        """其他視窗或程式修改了固定位租時重新列出，列表的 key 才會對應到目前的資料"""
+        if "fixed" in changed:
+            self.updateFixedRentList()
 
     def loadFixedRentData(self):
         """載入已存的固定位租資料"""
         try:
-            with open(self.data_path, 'r', encoding='utf-8') as f:
-                self.data_dict = json.load(f)
+            self.repository.days("fixed")
             self.updateFixedRentList()
-        except FileNotFoundError:
-            self.data_dict = {}
         except Exception as e:
             QMessageBox.warning(self, "錯誤", f"無法載入資料: {str(e)}")
 
     def updateFixedRentList(self):
         """更新固定位租列表（按日期排序）"""
-        self.fixed_rent_list.clear()
-        self.entry_map = {}  # 用於映射列表項文本到數據索引
-        
-        # 按日期排序
-        sorted_dates = sorted(self.data_dict.items(), key=lambda x: QDate.fromString(x[0], "yyyy-MM-dd"))
-        
-        for date, entries in sorted_dates:
-            for i, entry in enumerate(entries):
-                item_text = f"{date}: 市場: {entry[0]}, 租金: {entry[1]}元, 所有人: {entry[2]}, 使用人: {entry[3]}, 備註: {entry[4]}"
-                self.fixed_rent_list.addItem(item_text)
-                # 使用文本作為映射鍵
-                self.entry_map[item_text] = (date, i)
+        self.fixed_rent_model.refresh()
+
+    def updateDateFilter(self, *_):
+        if self.date_filter_check.isChecked():
+            self.fixed_rent_proxy.setDateRange(self.filter_start_date.date().toString("yyyy-MM-dd"),
+                                               self.filter_end_date.date().toString("yyyy-MM-dd"))
+        else:
+            self.fixed_rent_proxy.setDateRange()
 
     def applyDates(self):
         """應用每週重複日期設定"""
@@ -153,7 +202,7 @@ class FixedRentEditor(QWidget):
             return
             
         try:
-            float(self.rent_input.text())
+            parse_rent(self.rent_input.text())
         except ValueError:
             QMessageBox.warning(self, "錯誤", "租金必須是數字")
             return
@@ -164,49 +213,98 @@ class FixedRentEditor(QWidget):
                 self.user_input.text(),
                 self.note_input.text()]
         
-        # 處理每週重複日期
-        start_date = self.start_date.date()
-        end_date = self.end_date.date()
-        current_date = start_date
-        
-        while current_date <= end_date:
-            for i, cb in enumerate(self.week_days):
-                if cb.isChecked() and current_date.dayOfWeek() == i + 1:
-                    self.saveDataForDate(current_date, data)
-            current_date = current_date.addDays(1)
+        # 每週重複日期以一條規則保存，不再逐日複製資料列
+        weekdays = [i + 1 for i, cb in enumerate(self.week_days) if cb.isChecked()]
+        start_date = self.start_date.date().toPython()
+        end_date = self.end_date.date().toPython()
+        if not weekdays or start_date > end_date:
+            QMessageBox.warning(self, "錯誤", "請選擇星期與正確的日期範圍")
+            return
+        target_dates = RentRule(0, data, weekdays, start_date, end_date).dates_between(start_date, end_date)
+
+        # 檢查同一天同一個市場是否已有人承租
+        market = self.repository.resolve_market(data[0])
+        conflicts = [date_str for date_str in target_dates
+                     if self.repository.entries_at(date_str, market)]
+        if conflicts:
+            shown = "\n".join(conflicts[:10]) + ("\n..." if len(conflicts) > 10 else "")
+            reply = QMessageBox.question(self, "重複租用",
+                                         f"{market} 在以下日期已有租用紀錄，是否仍要加入？\n{shown}",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+
+        self.repository.add_fixed_rule(data, weekdays, start_date, end_date)
+        self.updateFixedRentList()
         
         QMessageBox.information(self, "成功", "已成功設定每週重複日期")
         
-    def saveDataForDate(self, date, data):
-        """將資料保存到指定日期並更新列表"""
-        date_str = date.toString("yyyy-MM-dd")
-        if date_str not in self.data_dict:
-            self.data_dict[date_str] = []
-        self.data_dict[date_str].append(data)
+    def deleteSelectedFixedRent(self):
+        """刪除選中的固定位租（可多選），全部以刪除前的索引一次處理"""
+        rows = self.fixed_rent_table.selectionModel().selectedRows()
+        if not rows:
+            return
+        keys = [self.fixed_rent_model.key(self.fixed_rent_proxy.mapToSource(index).row()) for index in rows]
+        if self.repository.remove_fixed_rows(keys):
+            QMessageBox.warning(self, "錯誤", "固定位租已被其他視窗修改，未刪除任何資料，請確認後再試一次")
         self.updateFixedRentList()
         
-    def deleteSelectedFixedRent(self):
-        """刪除選中的固定位租"""
-        selected_item = self.fixed_rent_list.currentItem()
-        if selected_item:
-            item_text = selected_item.text()
-            if item_text in self.entry_map:
-                date_str, entry_index = self.entry_map[item_text]
-            
-            # 從數據中刪除特定條目
-            if date_str in self.data_dict and entry_index < len(self.data_dict[date_str]):
-                del self.data_dict[date_str][entry_index]
-                
-                # 如果該日期沒有其他條目，刪除整個日期
-                if not self.data_dict[date_str]:
-                    del self.data_dict[date_str]
-            
+    def selectedSeries(self):
+        """目前選中列的 (日期, 系列代號)；不屬於任何系列時提示並回傳 None"""
+        index = self.fixed_rent_table.currentIndex()
+        if not index.isValid():
+            return None
+        key = self.fixed_rent_model.key(self.fixed_rent_proxy.mapToSource(index).row())
+        if not self.repository.row_matches("fixed", *key):
+            QMessageBox.warning(self, "錯誤", "固定位租已被其他視窗修改，請確認後再試一次")
             self.updateFixedRentList()
-        
+            return None
+        date_str, entry_index, _ = key
+        rule_id = self.repository.fixed_series_at(date_str, entry_index)
+        if rule_id is None:
+            QMessageBox.warning(self, "錯誤", "此項目不屬於任何系列")
+            return None
+        return date.fromisoformat(date_str), rule_id
+
+    def changeSelectedSeries(self):
+        selected = self.selectedSeries()
+        if selected is None:
+            return
+        day, rule_id = selected
+        row = list(self.repository.fixed_series(rule_id).row)
+        rent, ok = QInputDialog.getText(self, "修改租金", f"{day.isoformat()} 起的新租金:", text=row[1])
+        if not ok:
+            return
+        try:
+            parse_rent(rent)
+        except ValueError:
+            QMessageBox.warning(self, "錯誤", "租金必須是數字")
+            return
+        row[1] = rent.strip()
+        self.repository.change_fixed_series(rule_id, day, row)
+        self.updateFixedRentList()
+
+    def endSelectedSeries(self):
+        selected = self.selectedSeries()
+        if selected is None:
+            return
+        day, rule_id = selected
+        self.repository.end_fixed_series(rule_id, day)
+        self.updateFixedRentList()
+
+    def deleteSelectedSeries(self):
+        selected = self.selectedSeries()
+        if selected is None:
+            return
+        reply = QMessageBox.question(self, "刪除系列", "確定要刪除整個系列的固定位租？",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.repository.delete_fixed_series(selected[1])
+            self.updateFixedRentList()
+
     def closeEvent(self, event):
         try:
-            with open(self.data_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data_dict, f, ensure_ascii=False, indent=2)
+            self.repository.save("fixed")
         except Exception as e:
             QMessageBox.warning(self, "錯誤", f"保存數據失敗: {str(e)}")
         event.accept()
@@ -0,0 +1,75 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+HEADERS = ["日期", "市場", "租金", "所有人", "使用人", "備註"]
+
+class FixedRentTableModel(QAbstractTableModel):
+    """固定位租列表的資料模型：每列記 (日期, 資料列索引, 資料列內容)，
+    刪除或修改前以內容確認資料列沒有被其他視窗或程式改動；搭配 QTableView 只繪製畫面上看得到的列"""
+
+    def __init__(self, repository, parent=None):
+        super().__init__(parent)
+        self.repository = repository
+        self.keys = []
+
+    def refresh(self):
+        """依已排序的日期索引重新列出全部固定位租"""
+        self.beginResetModel()
+        self.keys = self.repository.row_keys("fixed")
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def key(self, row):
+        return self.keys[row]
+
+    def values(self, row):
+        """第 row 列的 [日期, 市場, 租金, 所有人, 使用人, 備註]"""
+        date_str, _, content = self.keys[row]
+        values = list(content)
+        values.extend([""] * (len(HEADERS) - 1 - len(values)))
+        return [date_str] + values[:len(HEADERS) - 1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.values(index.row())[index.column()]
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+class FixedRentFilterProxy(QSortFilterProxyModel):
+    """依市場、所有人、使用人（部分比對）與日期範圍篩選固定位租"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filters = {1: "", 3: "", 4: ""}
+        self.start = None
+        self.end = None
+
+    def setTextFilter(self, column, text):
+        self.filters[column] = text.strip()
+        self.invalidateFilter()
+
+    def setDateRange(self, start=None, end=None):
+        """start、end 為 yyyy-MM-dd 字串，None 表示不限"""
+        self.start = start
+        self.end = end
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        values = self.sourceModel().values(source_row)
+        if self.start and values[0] < self.start:
+            return False
+        if self.end and values[0] > self.end:
+            return False
+        return all(text in values[column] for column, text in self.filters.items() if text)
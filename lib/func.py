@@ -1,22 +1,9 @@
 import json
 import os
-from PySide6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout,
-    QPushButton, QMessageBox, QVBoxLayout, QScrollArea, QSpacerItem, QSizePolicy, QLabel, QLineEdit)
-from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QIcon
-
-class CustomLineEdit(QLineEdit):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-    def keyPressEvent(self, event):
-        if event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
-            self.clearFocus()
-        else:
-            super().keyPressEvent(event)
-
-def createLineEdit():
-    return CustomLineEdit()
+from PySide6.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+from PySide6.QtCore import QSize
+from lib.persistWorker import write_json_async
+from lib.dayRowModel import DayRowModel, DayRowDelegate, FIELD_COUNT, DELETE_COLUMN
 
 def load_json(path):
     """加載JSON文件，支持絕對和相對路徑"""
@@ -29,75 +16,68 @@ def load_json(path):
         return {}
 
 def save_json(data, path):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"✅ 資料已儲存至 {os.path.abspath(path)}")
+    """交給背景寫檔執行緒，不阻塞畫面"""
+    write_json_async(data, path)
 
-def AddNewRow(self):
-    row = QWidget(self.rowContainer)
-    row.setObjectName("row")
-    row_layout = QHBoxLayout(row)
+def markDayChanged(self):
+    """當天內容有變動時遞增世代計數，存檔時比對是否需要寫入"""
+    self.day_generation += 1
+
+def setupRowTable(self):
+    """以 QTableView 取代原本逐列建立 QLineEdit 的 scrollArea_2，畫面只為看得到的列建立元件"""
+    self.rowModel = DayRowModel(self)
+    self.rowModel.edited.connect(lambda: markDayChanged(self))
 
-    for i in range(5):
-        line = createLineEdit()
-        line.setObjectName(f"lineEdit_{i}")
-        row_layout.addWidget(line)
-        if i == 0:
-            line.setFocus()
+    table = QTableView(self.ui.page_5)
+    table.setModel(self.rowModel)
+    table.setItemDelegate(DayRowDelegate(table))
+    table.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked
+                          | QAbstractItemView.EditKeyPressed | QAbstractItemView.AnyKeyPressed)
+    # 欄位標題沿用上方的 top_label
+    table.horizontalHeader().hide()
+    table.verticalHeader().hide()
+    table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    for column in range(FIELD_COUNT):
+        table.horizontalHeader().setSectionResizeMode(column, QHeaderView.Stretch)
+    table.horizontalHeader().setSectionResizeMode(DELETE_COLUMN, QHeaderView.Fixed)
+    table.setColumnWidth(DELETE_COLUMN, 40)
+    table.setIconSize(QSize(24, 24))
+    table.clicked.connect(lambda index: onRowTableClicked(self, index))
 
-    btn_row = QWidget(self.rowContainer)
-    btn_layout = QHBoxLayout(btn_row)
-    button = QPushButton("", btn_row)
-    button.setIcon(QIcon(":/images/x.png"))
-    button.setIconSize(QSize(24, 24))
-    button.setObjectName("button")
-    btn_layout.addStretch()
-    btn_layout.addWidget(button)
+    self.ui.verticalLayout_3.replaceWidget(self.ui.scrollArea_2, table)
+    self.ui.scrollArea_2.hide()
+    self.rowTable = table
 
-    count = self.scrollAreaLayout.count()
-    self.scrollAreaLayout.insertWidget(count - 1, row)
-    self.scrollAreaLayout.insertWidget(count, btn_row)
+def onRowTableClicked(self, index):
+    if index.column() == DELETE_COLUMN:
+        RemoveRow(self, index.row())
 
-    button.clicked.connect(lambda _, r=row, b=btn_row: RemoveRow(self, r, b))
-    self.rowsManager.append((row, btn_row))
+def AddNewRow(self):
+    row = self.rowModel.append_rows([[""] * FIELD_COUNT])
+    index = self.rowModel.index(row, 0)
+    self.rowTable.setCurrentIndex(index)
+    self.rowTable.scrollTo(index)
+    self.rowTable.setFocus()
+    self.rowTable.edit(index)
 
-def RemoveRow(self, row, btn_row):
-    self.scrollAreaLayout.removeWidget(row)
-    self.scrollAreaLayout.removeWidget(btn_row)
-    row.deleteLater()
-    btn_row.deleteLater()
-    if (row, btn_row) in self.rowsManager:
-        self.rowsManager.remove((row, btn_row))
+def RemoveRow(self, row):
+    self.rowModel.remove_row(row)
 
 def exportToJsonDict(self, date_str):
-    result = []
-    for row_widget, _ in self.rowsManager:
-        row_data = []
-        for child in row_widget.findChildren(QLineEdit):
-            row_data.append(child.text())
-        result.append(row_data)
-    self.data_dict[date_str] = result
-    save_json(self.data_dict, self.data_path)
+    """只有當天內容變動過才寫入，單純瀏覽歷史資料不會寫檔"""
+    if self.day_generation == self.saved_generation:
+        return
+    self.repository.save_day("main", date_str, self.rowModel.values())
+    self.saved_generation = self.day_generation
 
 def clearAllRows(self):
-    for row, btn_row in self.rowsManager:
-        self.scrollAreaLayout.removeWidget(row)
-        self.scrollAreaLayout.removeWidget(btn_row)
-        row.deleteLater()
-        btn_row.deleteLater()
-    self.rowsManager.clear()
+    self.rowModel.load([])
 
 def loadCurrentDateRows(self):
-    clearAllRows(self)
-    date_data = self.data_dict.get(self.current_date, [])
-    for values in date_data:
-        AddNewRow(self)
-        row, _ = self.rowsManager[-1]
-        edits = row.findChildren(QLineEdit)
-        for i, text in enumerate(values):
-            if i < len(edits):
-                edits[i].setText(text)
+    # 只讀取該日所屬月份的資料，換日只需重設模型
+    self.rowModel.load(self.repository.rows("main", self.current_date))
+    self.day_generation = 0
+    self.saved_generation = 0
 
 def onDateChanged(self, date):
     exportToJsonDict(self, self.current_date)
@@ -0,0 +1,98 @@
+import json
+import os
+from lib.ledgerStore import JsonLedgerStore, read_json
+from lib.persistWorker import get_persist_worker, snapshot, write_json, record_own_write
+
+# 日誌超過此大小就併回快照檔
+COMPACT_THRESHOLD = 256 * 1024
+
+class JournalLedgerStore(JsonLedgerStore):
+    """快照檔 + 只追加的日誌：每次存檔只追加當天的一筆紀錄，
+    超過門檻時在背景寫檔執行緒把日誌併回快照（mainData.json）"""
+
+    def __init__(self, path, compact_threshold=COMPACT_THRESHOLD):
+        super().__init__(path)
+        self.journal_path = f"{path}.journal"
+        self.compact_threshold = compact_threshold
+        self.seq = 0
+        self.journal_size = 0
+
+    def load(self):
+        if self.data is None:
+            self.data = read_json(self.path)
+            self.replay(self.journal_path)
+            if os.path.exists(self.journal_path):
+                self.journal_size = os.path.getsize(self.journal_path)
+        return self.data
+
+    def replay(self, journal):
+        """依序號重播日誌；最後一行若因當機而不完整，則略過並截斷，避免之後的紀錄接在殘行後面"""
+        if not os.path.exists(journal):
+            return
+        valid_size = 0
+        with open(journal, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    print(f"❌ 日誌紀錄不完整，已略過：{journal}")
+                    break
+                valid_size += len(line)
+                if record["seq"] <= self.seq:
+                    continue
+                self.seq = record["seq"]
+                self.data[record["date"]] = record["rows"]
+        if valid_size < os.path.getsize(journal):
+            with open(journal, "r+b") as f:
+                f.truncate(valid_size)
+
+    def append(self, line):
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        record_own_write(self.journal_path)
+
+    def save_day(self, date_str, rows):
+        self.load()[date_str] = rows
+        self.seq += 1
+        line = json.dumps({"seq": self.seq, "date": date_str, "rows": rows}, ensure_ascii=False) + "\n"
+        get_persist_worker().submit(lambda: self.append(line))
+        self.journal_size += len(line.encode("utf-8"))
+        if self.journal_size > self.compact_threshold:
+            self.compact()
+
+    def write_snapshot(self, data):
+        """寫入快照後清空日誌；若兩步之間當機，重播日誌的結果仍相同"""
+        write_json(data, self.path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+            record_own_write(self.journal_path)
+        print(f"✅ 資料已儲存至 {os.path.abspath(self.path)}")
+
+    def compact(self):
+        """把日誌併回快照；排在先前所有追加之後，由背景寫檔執行緒執行"""
+        if self.data is None:
+            return
+        data = snapshot(self.data)
+        self.journal_size = 0
+        get_persist_worker().submit(lambda: self.write_snapshot(data), key=os.path.normpath(self.path))
+
+    def save(self, data):
+        self.data = data
+        self.compact()
+
+    def watch_paths(self):
+        return [self.path, self.journal_path]
+
+    def invalidate(self, paths):
+        self.data = None
+        self.seq = 0
+        self.journal_size = 0
+        return None
+
+    def close(self):
+        if self.journal_size > 0:
+            self.compact()
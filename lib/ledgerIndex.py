@@ -0,0 +1,163 @@
+import calendar
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+def to_ordinal(date_str):
+    """yyyy-MM-dd 轉為日期序數，格式錯誤時回傳 None"""
+    try:
+        return date.fromisoformat(date_str).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+def month_bounds(year, month):
+    """某年某月的第一天與最後一天"""
+    year, month = int(year), int(month)
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+def months_between(start, end):
+    """start 到 end 之間涵蓋的 (年, 月)"""
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+class DateIndex:
+    """已排序的日期序數索引，新增與刪除時以二分搜尋就地維護，
+    區間查詢為 O(log n + k)"""
+
+    def __init__(self):
+        self.ordinals = []
+        self.keys = []
+
+    def add(self, date_str):
+        ordinal = to_ordinal(date_str)
+        if ordinal is None:
+            return
+        pos = bisect_left(self.ordinals, ordinal)
+        if pos < len(self.ordinals) and self.ordinals[pos] == ordinal:
+            return
+        self.ordinals.insert(pos, ordinal)
+        self.keys.insert(pos, date_str)
+
+    def remove(self, date_str):
+        ordinal = to_ordinal(date_str)
+        if ordinal is None:
+            return
+        pos = bisect_left(self.ordinals, ordinal)
+        if pos < len(self.ordinals) and self.ordinals[pos] == ordinal:
+            del self.ordinals[pos]
+            del self.keys[pos]
+
+    def clear(self):
+        self.ordinals.clear()
+        self.keys.clear()
+
+    def between(self, start, end):
+        """日期介於 start 與 end（含，datetime.date）之間的日期字串，依時間排序"""
+        lo = bisect_left(self.ordinals, start.toordinal())
+        hi = bisect_right(self.ordinals, end.toordinal())
+        return self.keys[lo:hi]
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+class PartyIndex:
+    """以人員整數代號建立的倒排索引：代號 → 角色（owner / user）→ {(來源, 日期): [資料列索引]}，
+    查某人的帳目只需讀取他自己的資料列"""
+
+    def __init__(self):
+        self.postings = {}
+        # 每天登記過的 (代號, 角色)，移除時不必重新解析名稱
+        self.day_keys = {}
+
+    def add_day(self, source, date_str, entries):
+        key = (source, date_str)
+        registered = set()
+        for pos, entry in enumerate(entries):
+            for role, party_id in (("owner", entry.owner_id), ("user", entry.user_id)):
+                if party_id < 0:
+                    continue
+                roles = self.postings.setdefault(party_id, {"owner": {}, "user": {}})
+                roles[role].setdefault(key, []).append(pos)
+                registered.add((party_id, role))
+        if registered:
+            self.day_keys[key] = registered
+
+    def remove_day(self, source, date_str):
+        key = (source, date_str)
+        for party_id, role in self.day_keys.pop(key, ()):
+            roles = self.postings.get(party_id)
+            if roles is None:
+                continue
+            roles[role].pop(key, None)
+            if not roles["owner"] and not roles["user"]:
+                del self.postings[party_id]
+
+    def lookup(self, party_id, role):
+        """{(來源, 日期): [資料列索引]}"""
+        roles = self.postings.get(party_id)
+        return roles[role] if roles else {}
+
+    def party_ids(self):
+        return self.postings.keys()
+
+    def clear(self):
+        self.postings.clear()
+        self.day_keys.clear()
+
+class MarketIndex:
+    """已解析市場的索引：市場 → {(來源, 日期): [資料列索引]}，
+    以及 (日期, 市場) → [(來源, 資料列索引)]，查某個攤位或某天某個攤位只需讀取結果本身"""
+
+    def __init__(self):
+        self.postings = {}
+        self.pairs = {}
+        # 每天登記過的市場，移除時不必重新解析市場名稱
+        self.day_keys = {}
+
+    def add_day(self, source, date_str, entries, resolve):
+        key = (source, date_str)
+        registered = set()
+        for pos, entry in enumerate(entries):
+            if not entry.market:
+                continue
+            market = resolve(entry.market)
+            self.postings.setdefault(market, {}).setdefault(key, []).append(pos)
+            self.pairs.setdefault((date_str, market), []).append((source, pos))
+            registered.add(market)
+        if registered:
+            self.day_keys[key] = registered
+
+    def remove_day(self, source, date_str):
+        key = (source, date_str)
+        for market in self.day_keys.pop(key, ()):
+            days = self.postings.get(market)
+            if days is not None:
+                days.pop(key, None)
+                if not days:
+                    del self.postings[market]
+            pair = (date_str, market)
+            hits = [hit for hit in self.pairs.get(pair, ()) if hit[0] != source]
+            if hits:
+                self.pairs[pair] = hits
+            else:
+                self.pairs.pop(pair, None)
+
+    def lookup(self, market):
+        """{(來源, 日期): [資料列索引]}"""
+        return self.postings.get(market, {})
+
+    def at(self, date_str, market):
+        """某天某市場的 [(來源, 資料列索引)]"""
+        return self.pairs.get((date_str, market), [])
+
+    def markets(self):
+        return self.postings.keys()
+
+    def clear(self):
+        self.postings.clear()
+        self.pairs.clear()
+        self.day_keys.clear()
@@ -0,0 +1,490 @@
+import os
+import threading
+from functools import wraps
+from lib.ledgerStore import DATA_DIR, open_ledger_store, read_json
+from lib.persistWorker import write_json_async, flush_pending_writes, file_stamp, own_stamp
+from lib.rentEntry import parse_rows
+from lib.columnarLedger import ColumnarLedger
+from lib.nameResolver import NameResolver
+from lib.monthlyAggregate import MonthlyAggregate
+from lib.ruleStore import RuleLedgerStore, RULES_FILE
+from lib.ledgerIndex import DateIndex, PartyIndex, MarketIndex, month_bounds, months_between
+
+MAIN_FILE = "mainData.json"
+FIXED_FILE = "fixedRentData.json"
+NAME_BINDINGS_FILE = "name_bindings.json"
+MARKET_BINDINGS_FILE = "market_bindings.json"
+
+_repository = None
+
+def synchronized(method):
+    """背景執行緒（例如明細表計算）也會讀取資料，存取時須持有同一把鎖。
+    SQLite 連線只能在建立它的執行緒使用，背景計算前須先以 load_range 在主執行緒載入用到的月份"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def row_content(row):
+    """資料列內容的比對鍵，用來確認資料列在畫面取得之後沒有被改動"""
+    return tuple(str(v) for v in row)
+
+class LedgerRepository:
+    """全程式共用的帳本資料：主資料、固定位租與兩份綁定表。
+    資料第一次用到時才從儲存後端讀取，之後各視窗都直接查詢記憶體中的資料"""
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.lock = threading.RLock()
+        self.paths = {
+            "main": os.path.join(data_dir, MAIN_FILE),
+            "fixed": os.path.join(data_dir, FIXED_FILE),
+        }
+        self.stores = {source: open_ledger_store(path) for source, path in self.paths.items()}
+        # 固定位租以規則保存，讀取時才展開成逐日資料列
+        self.stores["fixed"] = RuleLedgerStore(self.stores["fixed"], os.path.join(data_dir, RULES_FILE))
+        # 各來源已載入的日期資料；視窗經由 rows、row_keys 等方法讀取，不直接引用
+        self.data = {source: {} for source in self.paths}
+        # 載入時即解析成 RentEntry，報表不必再處理字串
+        self.entries = {source: {} for source in self.paths}
+        self.invalid = {source: {} for source in self.paths}
+        # 已載入日期的排序索引，月份與區間查詢不必掃描全部日期
+        self.date_index = {source: DateIndex() for source in self.paths}
+        self.party_index = PartyIndex()
+        self.market_index = MarketIndex()
+        # (所有人, 使用人, 年月) 的租金彙總，隨每天的資料更新以差額維護
+        self.aggregate = MonthlyAggregate()
+        self.loaded_months = {source: set() for source in self.paths}
+        self.fully_loaded = set()
+        self.bindings = {
+            NAME_BINDINGS_FILE: read_json(os.path.join(data_dir, NAME_BINDINGS_FILE)),
+            MARKET_BINDINGS_FILE: read_json(os.path.join(data_dir, MARKET_BINDINGS_FILE)),
+        }
+        # 名稱綁定編譯成標準名稱與整數代號，鏈結與循環在這裡一次處理
+        self.resolver = NameResolver(self.name_bindings)
+        self.stamps = {path: file_stamp(path) for path in self.watch_paths()}
+        self.columnar_cache = {}
+
+    @property
+    def name_bindings(self):
+        return self.bindings[NAME_BINDINGS_FILE]
+
+    @property
+    def market_bindings(self):
+        return self.bindings[MARKET_BINDINGS_FILE]
+
+    def resolve_name(self, name):
+        return self.resolver.canonical(name)
+
+    def resolve_market(self, market):
+        return self.market_bindings.get(market, market)
+
+    def _put(self, source, date_str, rows):
+        """更新一天的資料並解析、驗證一次"""
+        self.party_index.remove_day(source, date_str)
+        self.market_index.remove_day(source, date_str)
+        self.aggregate.remove_day(source, date_str)
+        self.data[source][date_str] = rows
+        self.date_index[source].add(date_str)
+        self.columnar_cache.clear()
+        entries, errors = parse_rows(rows)
+        self.entries[source][date_str] = entries
+        self._assign_party_ids(entries)
+        self.party_index.add_day(source, date_str, entries)
+        self.aggregate.add_day(source, date_str, entries)
+        self.market_index.add_day(source, date_str, entries, self.resolve_market)
+        if errors:
+            self.invalid[source][date_str] = errors
+        else:
+            self.invalid[source].pop(date_str, None)
+
+    def _assign_party_ids(self, entries):
+        party_id = self.resolver.party_id
+        for entry in entries:
+            entry.owner_id = party_id(entry.owner)
+            entry.user_id = party_id(entry.user)
+
+    def _drop(self, source, date_str):
+        self.columnar_cache.clear()
+        self.date_index[source].remove(date_str)
+        self.data[source].pop(date_str, None)
+        self.entries[source].pop(date_str, None)
+        self.party_index.remove_day(source, date_str)
+        self.market_index.remove_day(source, date_str)
+        self.aggregate.remove_day(source, date_str)
+        self.invalid[source].pop(date_str, None)
+
+    def _merge(self, source, loaded):
+        """加入剛從儲存後端讀出的資料；記憶體中已有的日期以記憶體為準"""
+        data = self.data[source]
+        for date_str, rows in loaded.items():
+            if date_str not in data:
+                self._put(source, date_str, rows)
+
+    @synchronized
+    def days(self, source):
+        """該來源的全部日期資料"""
+        if source not in self.fully_loaded:
+            self._merge(source, self.stores[source].load())
+            self.fully_loaded.add(source)
+        return self.data[source]
+
+    @synchronized
+    def ensure_month(self, source, year, month):
+        month_key = f"{int(year):04d}-{int(month):02d}"
+        if source in self.fully_loaded or month_key in self.loaded_months[source]:
+            return
+        self._merge(source, self.stores[source].load_month(year, month))
+        self.loaded_months[source].add(month_key)
+
+    @synchronized
+    def load_range(self, start, end):
+        """載入兩個來源 start 到 end（含）的月份；已載入的月份不會重讀"""
+        for source in self.paths:
+            self.dates_between(source, start, end)
+
+    @synchronized
+    def dates_between(self, source, start, end):
+        """start 與 end（含）之間有資料的日期，依時間排序"""
+        for year, month in months_between(start, end):
+            self.ensure_month(source, year, month)
+        return self.date_index[source].between(start, end)
+
+    @synchronized
+    def month(self, source, year, month):
+        """該來源某年某月的日期資料"""
+        data = self.data[source]
+        return {date_str: data[date_str] for date_str in self.dates_between(source, *month_bounds(year, month))}
+
+    @synchronized
+    def rows(self, source, date_str):
+        year, month = date_str.split("-")[:2]
+        self.ensure_month(source, year, month)
+        return self.data[source].get(date_str, [])
+
+    @synchronized
+    def row_keys(self, source):
+        """已載入的每一筆資料列 (日期, 資料列索引, 資料列內容)，依日期排序"""
+        data = self.data[source]
+        return [(date_str, i, row_content(row))
+                for date_str in self.date_index[source] for i, row in enumerate(data[date_str])]
+
+    @synchronized
+    def row_matches(self, source, date_str, index, content):
+        """row_keys 取得的資料列是否仍在原位置且內容未變（其他視窗或程式可能已修改）"""
+        rows = self.data[source].get(date_str, [])
+        return index < len(rows) and row_content(rows[index]) == content
+
+    @synchronized
+    def all_entries(self, source):
+        """該來源全部日期的 RentEntry"""
+        self.days(source)
+        return self.entries[source]
+
+    @synchronized
+    def entries_between(self, source, start, end):
+        """start 與 end（含）之間的 RentEntry，依日期排序"""
+        entries = self.entries[source]
+        return {date_str: entries[date_str] for date_str in self.dates_between(source, start, end)}
+
+    def month_entries(self, source, year, month):
+        return self.entries_between(source, *month_bounds(year, month))
+
+    @synchronized
+    def party_entries(self, name, start=None, end=None):
+        """某人（名稱或代號皆可）為使用人或所有人的帳目，只讀取倒排索引中他自己的資料列。
+        回傳依日期排序的 (日期, 角色, RentEntry)；同一列兩者皆是時只算使用人"""
+        for source in self.paths:
+            if start is None:
+                self.days(source)
+            else:
+                self.dates_between(source, start, end)
+        low = start.isoformat() if start else ""
+        high = end.isoformat() if end else "9999"
+        order = {source: i for i, source in enumerate(self.paths)}
+        party_id = self.resolver.lookup_id(name)
+        hits = {}
+        for role in ("user", "owner"):
+            for (source, date_str), positions in self.party_index.lookup(party_id, role).items():
+                if not low <= date_str <= high:
+                    continue
+                entries = self.entries[source][date_str]
+                for pos in positions:
+                    hits.setdefault((date_str, order[source], pos), (role, entries[pos]))
+        return [(key[0], role, entry) for key, (role, entry) in sorted(hits.items(), key=lambda item: item[0])]
+
+    @synchronized
+    def market_entries(self, market, start=None, end=None):
+        """某市場（已套用市場綁定）的帳目，依日期排序的 (日期, 來源, RentEntry)"""
+        for source in self.paths:
+            if start is None:
+                self.days(source)
+            else:
+                self.dates_between(source, start, end)
+        low = start.isoformat() if start else ""
+        high = end.isoformat() if end else "9999"
+        order = {source: i for i, source in enumerate(self.paths)}
+        hits = []
+        for (source, date_str), positions in self.market_index.lookup(market).items():
+            if not low <= date_str <= high:
+                continue
+            entries = self.entries[source][date_str]
+            hits.extend(((date_str, order[source], pos), source, entries[pos]) for pos in positions)
+        hits.sort(key=lambda hit: hit[0])
+        return [(key[0], source, entry) for key, source, entry in hits]
+
+    @synchronized
+    def entries_at(self, date_str, market):
+        """某天某市場（已套用市場綁定）的帳目 [(來源, RentEntry)]"""
+        year, month = date_str.split("-")[:2]
+        for source in self.paths:
+            self.ensure_month(source, year, month)
+        return [(source, self.entries[source][date_str][pos])
+                for source, pos in self.market_index.at(date_str, market)]
+
+    @synchronized
+    def rebuild_party_index(self):
+        """名稱綁定變更後，重新編譯綁定、配發代號並重建倒排索引"""
+        self.resolver.compile(self.name_bindings)
+        self.party_index.clear()
+        self.aggregate.clear()
+        for source, days in self.entries.items():
+            for date_str, entries in days.items():
+                self._assign_party_ids(entries)
+                self.party_index.add_day(source, date_str, entries)
+                self.aggregate.add_day(source, date_str, entries)
+
+    @synchronized
+    def statement_totals(self, name, year, month):
+        """某人某月只計完整資料列的租金合計 (承租合計, 出租合計)，直接取自彙總表"""
+        first_day, last_day = month_bounds(year, month)
+        for source in self.paths:
+            self.dates_between(source, first_day, last_day)
+        return self.aggregate.party_totals(self.resolver.lookup_id(name),
+                                           first_day.strftime("%Y-%m"), complete_only=True)
+
+    @synchronized
+    def person_totals(self, name):
+        """某人全部月份的 (支出合計, 收入合計)：使用人為支出、所有人為收入"""
+        for source in self.paths:
+            self.days(source)
+        return self.aggregate.party_totals(self.resolver.lookup_id(name))
+
+    @synchronized
+    def verify_aggregate(self):
+        """以原始資料列重新計算彙總表，回傳不一致的格子（正常時為空）"""
+        return self.aggregate.verify(self.entries)
+
+    @synchronized
+    def rebuild_market_index(self):
+        """市場綁定變更後，依新的對應重建市場索引"""
+        self.market_index.clear()
+        for source, days in self.entries.items():
+            for date_str, entries in days.items():
+                self.market_index.add_day(source, date_str, entries, self.resolve_market)
+
+    def rebuild_indexes(self, file_name):
+        if file_name == MARKET_BINDINGS_FILE:
+            self.rebuild_market_index()
+        else:
+            self.rebuild_party_index()
+
+    @synchronized
+    def columnar(self, year=None, month=None):
+        """以欄位陣列表示的帳本（合併主資料與固定位租）；指定年月時只含該月份"""
+        key = None if year is None else (int(year), int(month))
+        ledger = self.columnar_cache.get(key)
+        if ledger is None:
+            if key is None:
+                sources = [self.all_entries(source) for source in self.paths]
+            else:
+                sources = [self.month_entries(source, *key) for source in self.paths]
+            ledger = ColumnarLedger.from_entries(sources)
+            self.columnar_cache[key] = ledger
+        return ledger
+
+    @synchronized
+    def invalid_rows(self):
+        """已載入資料中驗證失敗的資料列：(來源, 日期, 索引, 錯誤訊息)"""
+        return [(source, date_str, index, error)
+                for source, days in self.invalid.items()
+                for date_str, errors in sorted(days.items())
+                for index, error in errors]
+
+    @synchronized
+    def set_day(self, source, date_str, rows):
+        """只更新記憶體中的資料，由呼叫端決定何時存檔"""
+        self._put(source, date_str, rows)
+
+    @synchronized
+    def remove_day(self, source, date_str):
+        self._drop(source, date_str)
+
+    @synchronized
+    def save_day(self, source, date_str, rows):
+        self.set_day(source, date_str, rows)
+        self.stores[source].save_day(date_str, rows)
+
+    @synchronized
+    def save(self, source):
+        self.stores[source].save(dict(self.days(source)))
+
+    @synchronized
+    def add_fixed_rule(self, row, weekdays, start, end):
+        """新增一條每週重複的固定位租規則，只重新展開已載入且受影響的月份"""
+        rule = self.stores["fixed"].add_rule(row, weekdays, start, end)
+        self._reload_series(start, end)
+        return rule
+
+    @synchronized
+    def fixed_series_at(self, date_str, index):
+        """固定位租某天第 index 筆資料列所屬的系列（規則代號），逐日保存的資料列回傳 None"""
+        rule_ids = self.stores["fixed"].rule_ids_on(date_str)
+        offset = index - (len(self.data["fixed"].get(date_str, [])) - len(rule_ids))
+        return rule_ids[offset] if 0 <= offset < len(rule_ids) else None
+
+    def fixed_series(self, rule_id):
+        return self.stores["fixed"].rules[rule_id]
+
+    def _reload_series(self, start, end):
+        self.reload("fixed", {f"{year:04d}-{month:02d}" for year, month in months_between(start, end)})
+
+    @synchronized
+    def change_fixed_series(self, rule_id, day, row):
+        """系列自 day 起改用新的資料列（例如調整租金）"""
+        rule = self.fixed_series(rule_id)
+        start, end = max(day, rule.start), rule.end
+        self.stores["fixed"].change_rule_from(rule_id, day, row)
+        self._reload_series(start, end)
+
+    @synchronized
+    def end_fixed_series(self, rule_id, day):
+        """系列提前結束於 day（含）"""
+        rule = self.fixed_series(rule_id)
+        start, end = rule.start, rule.end
+        self.stores["fixed"].end_rule(rule_id, day)
+        self._reload_series(max(start, day), end)
+
+    @synchronized
+    def delete_fixed_series(self, rule_id):
+        rule = self.fixed_series(rule_id)
+        start, end = rule.start, rule.end
+        self.stores["fixed"].delete_rule(rule_id)
+        self._reload_series(start, end)
+
+    @synchronized
+    def remove_fixed_rows(self, keys):
+        """一次刪除多筆固定位租，keys 為 row_keys 取得的 (日期, 資料列索引, 資料列內容)，
+        索引皆以刪除前的資料為準。規則產生的資料列記為例外日期，逐日保存的資料列直接存檔。
+        任何一筆與目前資料不符時不刪除，回傳不符的 keys"""
+        stale = [key for key in keys if not self.row_matches("fixed", *key)]
+        if stale:
+            return stale
+        store = self.stores["fixed"]
+        by_date = {}
+        for date_str, index, _ in keys:
+            by_date.setdefault(date_str, set()).add(index)
+        occurrences = []
+        kept_days = {}
+        for date_str, indexes in by_date.items():
+            rows = self.data["fixed"].get(date_str, [])
+            rule_ids = store.rule_ids_on(date_str)
+            base_count = len(rows) - len(rule_ids)
+            occurrences.extend((rule_ids[i - base_count], date_str)
+                               for i in indexes if base_count <= i < len(rows))
+            kept_days[date_str] = [row for i, row in enumerate(rows) if i not in indexes]
+        # 先記下例外日期，存檔時才能正確分出逐日保存的資料列
+        if occurrences:
+            store.add_exceptions(occurrences)
+        for date_str, kept in kept_days.items():
+            self.save_day("fixed", date_str, kept)
+            if not kept:
+                self.remove_day("fixed", date_str)
+        return []
+
+    @synchronized
+    def save_bindings(self, file_name):
+        self.columnar_cache.clear()
+        self.rebuild_indexes(file_name)
+        write_json_async(self.bindings[file_name], os.path.join(self.data_dir, file_name))
+
+    def watch_paths(self):
+        paths = [os.path.join(self.data_dir, file_name) for file_name in self.bindings]
+        for store in self.stores.values():
+            paths.extend(store.watch_paths())
+        return paths
+
+    @synchronized
+    def refresh(self):
+        """比對檔案的修改時間與大小，只重新讀取被其他程式改過的檔案；
+        回傳有變動的來源名稱（main / fixed）或綁定檔名"""
+        flush_pending_writes()
+        changed_paths = []
+        # 已記錄的路徑也要檢查，才能發現被刪除的分片
+        for path in set(self.watch_paths()) | set(self.stamps):
+            stamp = file_stamp(path)
+            if stamp != self.stamps.get(path) and stamp != own_stamp(path):
+                changed_paths.append(path)
+            self.stamps[path] = stamp
+
+        changed = set()
+        for file_name, bindings in self.bindings.items():
+            if os.path.join(self.data_dir, file_name) in changed_paths:
+                bindings.clear()
+                bindings.update(read_json(os.path.join(self.data_dir, file_name)))
+                self.columnar_cache.clear()
+                self.rebuild_indexes(file_name)
+                changed.add(file_name)
+        for source, store in self.stores.items():
+            source_paths = [path for path in changed_paths if path in store.watch_paths()
+                            or os.path.dirname(path) == getattr(store, "shard_dir", None)]
+            if source_paths:
+                self.reload(source, store.invalidate(source_paths))
+                changed.add(source)
+        return changed
+
+    @synchronized
+    def reload(self, source, months=None):
+        """重新讀取已載入的資料，並就地更新字典讓引用它的視窗看到新內容"""
+        store = self.stores[source]
+        data = self.data[source]
+        if months is None:
+            if source in self.fully_loaded:
+                fresh = store.load()
+            else:
+                fresh = {}
+                for month_key in self.loaded_months[source]:
+                    fresh.update(store.load_month(*month_key.split("-")))
+            for date_str in list(data):
+                self._drop(source, date_str)
+            self._merge(source, fresh)
+            return
+        for month_key in months:
+            if source not in self.fully_loaded and month_key not in self.loaded_months[source]:
+                continue
+            for date_str in [d for d in data if d.startswith(month_key)]:
+                self._drop(source, date_str)
+            self._merge(source, store.load_month(*month_key.split("-")))
+
+    @synchronized
+    def names(self):
+        """帳目中出現過的所有人、使用人以及綁定表中的代號與名稱"""
+        names = set()
+        for source in self.paths:
+            for entries in self.days(source).values():
+                for entry in entries:
+                    if len(entry) >= 4:
+                        if entry[2]:
+                            names.add(entry[2])
+                        if entry[3]:
+                            names.add(entry[3])
+        names.update(self.name_bindings.keys())
+        names.update(self.name_bindings.values())
+        return names
+
+def get_repository():
+    global _repository
+    if _repository is None:
+        _repository = LedgerRepository()
+    return _repository
@@ -0,0 +1,91 @@
+import json
+import os
+from lib.persistWorker import write_json_async, flush_pending_writes
+
+DATA_DIR = os.path.join("resources", "jsonData")
+SQLITE_NAME = "ledger.sqlite3"
+
+# 帳本檔名與儲存來源名稱的對應
+SOURCES = {
+    "mainData.json": "main",
+    "fixedRentData.json": "fixed",
+}
+
+_stores = {}
+
+def source_name(path):
+    """由帳本路徑取得來源名稱（main / fixed）"""
+    file_name = os.path.basename(path)
+    return SOURCES.get(file_name, os.path.splitext(file_name)[0])
+
+def read_json(path):
+    """讀取帳本JSON，檔案不存在或損毀時回傳空字典"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"❌ 無法讀取 JSON: {str(e)}")
+        return {}
+
+class JsonLedgerStore:
+    """整份JSON檔案的帳本儲存（原本的寫法）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = None
+
+    def load(self):
+        if self.data is None:
+            self.data = read_json(self.path)
+        return self.data
+
+    def load_month(self, year, month):
+        prefix = f"{int(year):04d}-{int(month):02d}-"
+        return {date_str: rows for date_str, rows in self.load().items() if date_str.startswith(prefix)}
+
+    def save_day(self, date_str, rows):
+        self.load()[date_str] = rows
+        write_json_async(self.data, self.path)
+
+    def save(self, data):
+        self.data = data
+        write_json_async(data, self.path)
+
+    def watch_paths(self):
+        return [self.path]
+
+    def invalidate(self, paths):
+        """外部修改後丟棄快取；回傳失效的月份，None 代表整份資料"""
+        self.data = None
+        return None
+
+    def close(self):
+        pass
+
+def open_ledger_store(path):
+    """依資料目錄中已存在的檔案選擇儲存後端，同一路徑共用同一個實例"""
+    path = os.path.normpath(path)
+    store = _stores.get(path)
+    if store is None:
+        db_path = os.path.join(os.path.dirname(path), SQLITE_NAME)
+        shard_dir = os.path.join(os.path.dirname(path), source_name(path))
+        if os.path.exists(db_path):
+            from lib.sqliteStore import SqliteLedgerStore
+            store = SqliteLedgerStore(db_path, source_name(path))
+        elif os.path.isdir(shard_dir):
+            from lib.shardStore import ShardedLedgerStore
+            store = ShardedLedgerStore(shard_dir)
+        else:
+            from lib.journalStore import JournalLedgerStore
+            store = JournalLedgerStore(path)
+        _stores[path] = store
+    return store
+
+def close_ledger_stores():
+    """關閉所有帳本並等待背景寫入完成"""
+    for store in _stores.values():
+        store.close()
+    _stores.clear()
+    flush_pending_writes()
@@ -0,0 +1,65 @@
+import os
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+from lib.ledgerRepository import get_repository
+from lib.persistWorker import flush_pending_writes
+
+_watcher = None
+
+class LedgerWatcher(QObject):
+    """監看 resources/jsonData/ 下的帳本檔案，被其他程式或另一個視窗實例修改時，
+    只重新讀取有變動的檔案並通知各視窗"""
+
+    dataChanged = Signal(object)
+
+    def __init__(self, repository, parent=None, poll_interval=3000):
+        super().__init__(parent)
+        self.repository = repository
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.schedule)
+        self.watcher.directoryChanged.connect(self.schedule)
+
+        # 合併短時間內的多次通知
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(300)
+        self.debounce.timeout.connect(self.refresh)
+
+        # 網路磁碟等收不到通知的情況，改以修改時間與大小輪詢
+        self.poll = QTimer(self)
+        self.poll.setInterval(poll_interval)
+        self.poll.timeout.connect(self.refresh)
+        self.poll.start()
+
+        self.updateWatchList()
+
+    def updateWatchList(self):
+        """以 rename 取代的檔案會從監看清單消失，每次檢查後重新加入"""
+        dirs = {self.repository.data_dir}
+        for store in self.repository.stores.values():
+            shard_dir = getattr(store, "shard_dir", None)
+            if shard_dir and os.path.isdir(shard_dir):
+                dirs.add(shard_dir)
+        paths = dirs | {path for path in self.repository.watch_paths() if os.path.exists(path)}
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        missing = [path for path in paths if path not in watched]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def schedule(self, *_):
+        self.debounce.start()
+
+    def refresh(self):
+        # 自己的寫入尚未完成時稍後再檢查，不在畫面執行緒等待
+        if not flush_pending_writes(timeout=0):
+            self.debounce.start()
+            return
+        changed = self.repository.refresh()
+        self.updateWatchList()
+        if changed:
+            self.dataChanged.emit(changed)
+
+def get_ledger_watcher():
+    global _watcher
+    if _watcher is None:
+        _watcher = LedgerWatcher(get_repository())
+    return _watcher
@@ -5,12 +5,16 @@ from PySide6.QtWidgets import (QMainWindow, QLineEdit, QWidget, QHBoxLayout,
 from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QIcon, QAction
 from lib.main_ui import Ui_MainWindow
+from lib.ledgerRepository import get_repository
+from lib.ledgerWatcher import get_ledger_watcher
+from lib.persistWorker import flush_pending_writes
 from lib.fixedRentEditor import FixedRentEditor
-from lib.func import load_json, AddNewRow, exportToJsonDict, loadCurrentDateRows, onDateChanged
+from lib.func import setupRowTable, AddNewRow, exportToJsonDict, loadCurrentDateRows, onDateChanged
 from lib.moneyCalculate import RentSummaryInputDialog, RentSummaryPreview
 from lib.bindingCode import NameBindingDialog
 from lib.dateViewer import DateViewer
 from lib.personSummary import PersonSummaryDialog
+from lib.batchSettlement import BatchSettlementDialog
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -23,9 +27,9 @@ class MainWindow(QMainWindow):
         # 初始化選單
         self.init_menu()
         
-        self.rowContainer = self.ui.scrollAreaWidgetContents_2
-        self.scrollAreaLayout = self.ui.verticalLayout_4
-        self.rowsManager = []
+        setupRowTable(self)
+        self.day_generation = 0
+        self.saved_generation = 0
         self.ui.addColumn.clicked.connect(lambda _: AddNewRow(self))
         self.ui.addColumn.setShortcut(Qt.Key_Space)
         self.ui.fixedRent.triggered.connect(self.openFixedRentEditor)
@@ -34,7 +38,9 @@ class MainWindow(QMainWindow):
         
         # 載入資料
         self.data_path = "resources/jsonData/mainData.json"
-        self.data_dict = load_json(self.data_path)
+        self.repository = get_repository()
+        self.watcher = get_ledger_watcher()
+        self.watcher.dataChanged.connect(self.onLedgerChanged)
         
         loadCurrentDateRows(self)
         self.ui.moneyCalculate.triggered.connect(self.openRentSummary)
@@ -45,6 +51,11 @@ class MainWindow(QMainWindow):
         self.date_viewer_btn.clicked.connect(self.openDateViewer)
         self.menuBar().setCornerWidget(self.date_viewer_btn, Qt.TopLeftCorner)
 
+    def onLedgerChanged(self, changed):
+        """其他程式修改了主資料時重新顯示當天資料；正在編輯中的內容則保留"""
+        if "main" in changed and self.day_generation == self.saved_generation:
+            loadCurrentDateRows(self)
+
     def openRentSummary(self):
         exportToJsonDict(self, self.current_date)
         dialog = RentSummaryInputDialog()
@@ -73,6 +84,11 @@ class MainWindow(QMainWindow):
         self.personSummary = PersonSummaryDialog()
         self.personSummary.show()
 
+    def openBatchSettlement(self):
+        exportToJsonDict(self, self.current_date)
+        self.batchSettlement = BatchSettlementDialog()
+        self.batchSettlement.show()
+
     def init_menu(self):
         """初始化選單功能"""
         report_menu = self.menuBar().addMenu("報表")
@@ -81,6 +97,11 @@ class MainWindow(QMainWindow):
         person_summary_action = QAction("個人收支總結", self)
         person_summary_action.triggered.connect(self.openPersonSummary)
         report_menu.addAction(person_summary_action)
+
+        # 批次月結
+        batch_settlement_action = QAction("批次月結", self)
+        batch_settlement_action.triggered.connect(self.openBatchSettlement)
+        report_menu.addAction(batch_settlement_action)
         
     def closeEvent(self, event):
         exportToJsonDict(self, self.current_date)
@@ -91,6 +112,7 @@ class MainWindow(QMainWindow):
         msg.exec()
 
         if msg.clickedButton() == yes_btn:
+            flush_pending_writes()
             event.accept()
         elif msg.clickedButton() == no_btn:
             event.ignore()
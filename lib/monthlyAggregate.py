@@ -0,0 +1,85 @@
+class MonthlyAggregate:
+    """依 (所有人代號, 使用人代號, 年月) 累計的租金彙總表，每格為
+    [租金合計, 筆數, 完整資料列租金合計, 完整資料列筆數]（金額以分為單位）。
+    每天的資料更新時只扣掉舊的貢獻再加上新的，不必重新掃描原始資料列"""
+
+    def __init__(self):
+        self.cells = {}
+        # 人員代號 → 他以所有人或使用人身分出現的格子
+        self.by_party = {}
+        # 每天貢獻過的 (格子, 租金, 是否完整)，移除時依此扣回
+        self.day_rows = {}
+
+    def add_day(self, source, date_str, entries):
+        month_key = date_str[:7]
+        contributions = []
+        for entry in entries:
+            if entry.rent is None:
+                continue
+            key = (entry.owner_id, entry.user_id, month_key)
+            complete = entry.is_complete()
+            self._apply(key, entry.rent, complete, 1)
+            contributions.append((key, entry.rent, complete))
+        if contributions:
+            self.day_rows[(source, date_str)] = contributions
+
+    def remove_day(self, source, date_str):
+        for key, rent, complete in self.day_rows.pop((source, date_str), ()):
+            self._apply(key, rent, complete, -1)
+
+    def _apply(self, key, rent, complete, sign):
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = [0, 0, 0, 0]
+            for party_id in key[:2]:
+                if party_id >= 0:
+                    self.by_party.setdefault(party_id, set()).add(key)
+        cell[0] += sign * rent
+        cell[1] += sign
+        if complete:
+            cell[2] += sign * rent
+            cell[3] += sign
+        if cell[1] == 0:
+            del self.cells[key]
+            for party_id in key[:2]:
+                keys = self.by_party.get(party_id)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.by_party[party_id]
+
+    def party_totals(self, party_id, month_key=None, complete_only=False):
+        """某人為使用人與所有人的租金合計 (使用人合計, 所有人合計)；
+        同一列兩者皆是時只算使用人，month_key（yyyy-MM）為 None 時合計所有月份"""
+        offset = 2 if complete_only else 0
+        user_total = 0
+        owner_total = 0
+        for key in self.by_party.get(party_id, ()):
+            if month_key is not None and key[2] != month_key:
+                continue
+            rent = self.cells[key][offset]
+            if key[1] == party_id:
+                user_total += rent
+            else:
+                owner_total += rent
+        return user_total, owner_total
+
+    def clear(self):
+        self.cells.clear()
+        self.by_party.clear()
+        self.day_rows.clear()
+
+    def verify(self, entries_by_source):
+        """由原始 RentEntry 重新計算並與目前的彙總比較，回傳不一致的格子
+        {格子: (彙總值, 重新計算值)}"""
+        fresh = MonthlyAggregate()
+        for source, days in entries_by_source.items():
+            for date_str, entries in days.items():
+                fresh.add_day(source, date_str, entries)
+        mismatches = {}
+        for key in self.cells.keys() | fresh.cells.keys():
+            current = self.cells.get(key)
+            expected = fresh.cells.get(key)
+            if current != expected:
+                mismatches[key] = (current, expected)
+        return mismatches
@@ -0,0 +1,68 @@
+class NameResolver:
+    """將 name_bindings.json 編譯成標準名稱與整數代號：
+    代號 → 別名 → 名稱的鏈結以 union-find 一次解析到底，並找出循環綁定"""
+
+    def __init__(self, bindings=None):
+        self.compile(bindings or {})
+
+    def compile(self, bindings):
+        parent = {}
+
+        def find(name):
+            root = name
+            while parent.setdefault(root, root) != root:
+                root = parent[root]
+            # 路徑壓縮
+            while parent[name] != root:
+                parent[name], name = root, parent[name]
+            return root
+
+        for code, name in bindings.items():
+            root_code, root_name = find(code), find(name)
+            if root_code != root_name:
+                parent[root_code] = root_name
+
+        groups = {}
+        for name in parent:
+            groups.setdefault(find(name), []).append(name)
+
+        self.canonical_names = {}
+        self.cycles = []
+        for members in groups.values():
+            # 鏈結的終點（不再對應到其他名稱者）即為標準名稱
+            terminals = [name for name in members if bindings.get(name, name) == name]
+            if terminals:
+                canonical = terminals[0]
+            else:
+                cycle = sorted(members)
+                self.cycles.append(cycle)
+                canonical = cycle[0]
+                print(f"❌ 名稱綁定有循環: {' → '.join(cycle)}，暫以 {canonical} 為準")
+            for name in members:
+                self.canonical_names[name] = canonical
+
+        self.ids = {}
+        self.id_names = []
+
+    def canonical(self, name):
+        """名稱或代號對應的標準名稱"""
+        return self.canonical_names.get(name, name)
+
+    def party_id(self, name):
+        """標準名稱的整數代號，第一次出現時配發；空白名稱為 -1"""
+        if not name:
+            return -1
+        name = self.canonical(name)
+        party_id = self.ids.get(name)
+        if party_id is None:
+            party_id = len(self.id_names)
+            self.ids[name] = party_id
+            self.id_names.append(name)
+        return party_id
+
+    def lookup_id(self, name):
+        """查詢既有代號，不存在時回傳 -1"""
+        return self.ids.get(self.canonical(name), -1) if name else -1
+
+    def name_of(self, party_id):
+        return self.id_names[party_id]
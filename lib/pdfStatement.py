@@ -0,0 +1,89 @@
+import os
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from lib.settlement import HEADERS
+
+# reportlab 內建的繁體中文字型，不需額外的字型檔
+FONT_NAME = "MSung-Light"
+# 份數不多時開行程的成本高於排版本身
+PROCESS_THRESHOLD = 50
+pdfmetrics.registerFont(UnicodeCIDFont(FONT_NAME))
+
+TITLE_STYLE = ParagraphStyle("title", fontName=FONT_NAME, fontSize=20, leading=26,
+                             alignment=TA_CENTER, spaceAfter=4 * mm)
+META_STYLE = ParagraphStyle("meta", fontName=FONT_NAME, fontSize=10, leading=14,
+                            alignment=TA_CENTER, spaceAfter=6 * mm)
+DIFF_STYLE = ParagraphStyle("diff", fontName=FONT_NAME, fontSize=10, leading=14,
+                            alignment=TA_RIGHT, spaceBefore=8 * mm)
+TABLE_STYLE = TableStyle([
+    ("FONTNAME", (0, 0), (-1, -1), FONT_NAME),
+    ("FONTSIZE", (0, 0), (-1, -1), 10),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
+])
+NBSP = "&nbsp;" * 4
+
+def statement_flowables(owner_name, user_name, date_range, print_date, rows, diff_text):
+    """一份明細表的內容；參數與 statement_html 相同，表格跨頁時每頁重複欄位名稱。
+    Paragraph 會解析標記，名稱與說明文字須先跳脫 <、>、&"""
+    meta = NBSP.join([f"<b>客戶名稱：</b>{escape(user_name)}",
+                      f"<b>起始日期：</b>{escape(date_range)}",
+                      f"<b>列印日期：</b>{escape(print_date)}"])
+    table = Table([HEADERS] + [list(row) for row in rows], repeatRows=1,
+                  colWidths=[(A4[0] - 30 * mm) / len(HEADERS)] * len(HEADERS))
+    table.setStyle(TABLE_STYLE)
+    flowables = [
+        Paragraph(f"{escape(owner_name)} 租金應收付明細表", TITLE_STYLE),
+        Paragraph(meta, META_STYLE),
+        table,
+    ]
+    if diff_text:
+        flowables.append(Paragraph(escape(diff_text).replace("\n", NBSP), DIFF_STYLE))
+    return flowables
+
+def _draw_page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont(FONT_NAME, 9)
+    canvas.drawCentredString(A4[0] / 2, 10 * mm, f"第 {doc.page} 頁")
+    canvas.restoreState()
+
+def write_statements_pdf(path, jobs):
+    """多份明細表寫入同一個 PDF，每份從新的一頁開始；jobs 為 statement_html 參數的 tuple"""
+    story = []
+    for job in jobs:
+        if story:
+            story.append(PageBreak())
+        story.extend(statement_flowables(*job))
+    if not story:
+        story.append(Spacer(1, 1))
+    doc = SimpleDocTemplate(path, pagesize=A4, leftMargin=15 * mm, rightMargin=15 * mm,
+                            topMargin=15 * mm, bottomMargin=18 * mm)
+    doc.build(story, onFirstPage=_draw_page_number, onLaterPages=_draw_page_number)
+    return path
+
+def write_statement_pdf(path, owner_name, user_name, date_range, print_date, rows, diff_text):
+    return write_statements_pdf(path, [(owner_name, user_name, date_range, print_date, rows, diff_text)])
+
+def _write_job(args):
+    path, job = args
+    return write_statement_pdf(path, *job)
+
+def write_statement_pdfs(folder, named_jobs, max_workers=None, processes=False):
+    """每份明細表各寫成一個 PDF；named_jobs 為 [(檔名, job)]，回傳寫出的檔案路徑。
+    processes 為真且份數多時分散到多個行程，只供命令列使用，Qt 程式內不要開啟"""
+    os.makedirs(folder, exist_ok=True)
+    tasks = [(os.path.join(folder, f"{file_name}.pdf"), job) for file_name, job in named_jobs]
+    if not processes or len(tasks) < PROCESS_THRESHOLD:
+        return [_write_job(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_write_job, tasks, chunksize=max(1, len(tasks) // 32)))
@@ -0,0 +1,108 @@
+import atexit
+import json
+import os
+import threading
+from collections import OrderedDict
+from itertools import count
+
+_worker = None
+_worker_lock = threading.Lock()
+# 本程式最後一次寫入後各檔案的 (mtime, size)，用來分辨外部修改
+_own_stamps = {}
+
+class PersistWorker:
+    """單一背景寫檔執行緒：依序執行寫入工作，同一檔案尚未寫出的重複存檔只保留最後一次"""
+
+    def __init__(self):
+        self.pending = OrderedDict()
+        self.busy = False
+        self.last_error = None
+        self.cond = threading.Condition()
+        self.seq = count()
+        self.thread = threading.Thread(target=self.run, name="PersistWorker", daemon=True)
+        self.thread.start()
+
+    def submit(self, job, key=None):
+        """key 相同的待寫工作會被取代並移到佇列尾端；key 為 None 的工作（例如日誌追加）一律保留"""
+        with self.cond:
+            if key is None:
+                key = ("job", next(self.seq))
+            else:
+                self.pending.pop(key, None)
+            self.pending[key] = job
+            self.cond.notify_all()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                key, job = self.pending.popitem(last=False)
+                self.busy = True
+            try:
+                job()
+            except Exception as e:
+                self.last_error = e
+                print(f"❌ 背景寫入失敗 {key}: {str(e)}")
+            finally:
+                with self.cond:
+                    self.busy = False
+                    self.cond.notify_all()
+
+    def flush(self, timeout=None):
+        """等待所有排隊中的寫入完成"""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pending and not self.busy, timeout)
+
+def get_persist_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = PersistWorker()
+            atexit.register(_worker.flush)
+    return _worker
+
+def flush_pending_writes(timeout=None):
+    if _worker is not None:
+        return _worker.flush(timeout)
+    return True
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def record_own_write(path):
+    _own_stamps[os.path.normpath(path)] = file_stamp(path)
+
+def own_stamp(path):
+    return _own_stamps.get(os.path.normpath(path), False)
+
+def write_json(data, path):
+    """先寫入暫存檔並 fsync，再以 rename 取代原檔，寫到一半當機也不會毀損原檔"""
+    dir_name = os.path.dirname(path)
+    if dir_name:
+        os.makedirs(dir_name, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    record_own_write(path)
+
+def snapshot(data):
+    """複製到第二層，背景執行緒序列化時不受畫面端後續修改影響"""
+    return {key: list(value) if isinstance(value, list) else value for key, value in data.items()}
+
+def write_json_async(data, path):
+    """排入背景寫入（暫存檔、fsync、rename），同一路徑的連續存檔會合併"""
+    data = snapshot(data)
+
+    def job():
+        write_json(data, path)
+        print(f"✅ 資料已儲存至 {os.path.abspath(path)}")
+
+    get_persist_worker().submit(job, key=os.path.normpath(path))
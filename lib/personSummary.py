@@ -1,5 +1,3 @@
-import json
-import os
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                               QComboBox, QPushButton, QMessageBox, QScrollArea,
                               QWidget, QGridLayout)
@@ -7,14 +5,17 @@ from PySide6.QtCore import Qt
 from PySide6.QtPrintSupport import QPrinter, QPrintDialog
 from PySide6.QtGui import QTextDocument
 from lib.bindingCode import NameBindingDialog
+from lib.ledgerRepository import get_repository
+from lib.rentEntry import format_rent
+from lib.settlement import person_summary
 
 class PersonSummaryDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.data_paths = ["resources/jsonData/mainData.json", "resources/jsonData/fixedRentData.json"]
+        self.repository = get_repository()
+        self.sources = ["main", "fixed"]
         self.setWindowTitle("個人收支總結")
         self.resize(600, 400)
-        self.bindings = {}
         self.initUI()
         
     def initUI(self):
@@ -61,34 +62,24 @@ class PersonSummaryDialog(QDialog):
         self.setLayout(layout)
         
     def resolve_name(self, code):
-        """根據代號解析實際名稱"""
-        return self.bindings.get(code, code)
+        """根據代號解析實際名稱，代號 → 別名 → 名稱的鏈結會一路解析到底"""
+        return self.repository.resolve_name(code)
         
     def load_persons(self):
         """加載所有人員（包括使用人和所有人）"""
         try:
-            # 從綁定文件加載人員
-            binding_path = "resources/jsonData/name_bindings.json"
-            if os.path.exists(binding_path):
-                with open(binding_path, 'r', encoding='utf-8') as f:
-                    self.bindings = json.load(f)
-            else:
-                self.bindings = {}
-                    
             persons = set()
             
-            # 從兩個數據源加載出現過的所有人
-            for data_path in self.data_paths:
-                if os.path.exists(data_path):
-                    with open(data_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        for month_data in data.values():
-                            for entry in month_data:
-                                if len(entry) > 2:
-                                    if entry[2]:  # 使用人
-                                        persons.add(self.resolve_name(entry[2]))
-                                    if len(entry) > 3 and entry[3]:  # 所有人
-                                        persons.add(self.resolve_name(entry[3]))
+            # 從兩個數據源加載出現過的所有人；走訪共用資料時持有儲存庫的鎖
+            with self.repository.lock:
+                for source in self.sources:
+                    data = self.repository.all_entries(source)
+                    for month_data in data.values():
+                        for entry in month_data:
+                            if entry.owner:
+                                persons.add(self.resolve_name(entry.owner))
+                            if entry.user:
+                                persons.add(self.resolve_name(entry.user))
                                     
             # 按字母順序排序並添加到下拉框
             for person in sorted(persons):
@@ -104,51 +95,20 @@ class PersonSummaryDialog(QDialog):
             return
             
         try:
-            total_income = 0
-            total_expense = 0
-            income_details = []
-            expense_details = []
-            
-            # 處理兩個數據源
-            for data_path in self.data_paths:
-                if not os.path.exists(data_path):
-                    continue
-                    
-                with open(data_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # 計算總收支
-                for month, month_data in data.items():
-                    for entry in month_data:
-                        if len(entry) > 2:
-                            owner = self.resolve_name(entry[2])
-                            user = self.resolve_name(entry[3]) if len(entry) > 3 else None
-                            
-                            # 處理收入（使用人）
-                            if user == selected_person:
-                                try:
-                                    amount = float(entry[1])
-                                    total_expense += amount
-                                    market = self.resolve_name(entry[0])
-                                    expense_details.append(f"{month} - {market}: NT$ {amount:,}")
-                                except (ValueError, IndexError):
-                                    pass
-                            
-                            # 處理支出（所有人）
-                            elif owner == selected_person:
-                                try:
-                                    amount = float(entry[1])
-                                    total_income += amount
-                                    market = self.resolve_name(entry[0])
-                                    income_details.append(f"{month} - {market}: NT$ {amount:,}")
-                                except (ValueError, IndexError):
-                                    pass
+            # 合計取自月彙總表、明細取自倒排索引；金額皆以分為單位
+            summary = person_summary(self.repository, selected_person)
+            total_income = summary.total_income
+            total_expense = summary.total_expense
+            income_details = [f"{date_str} - {market}: NT$ {format_rent(rent)}"
+                              for date_str, market, rent in summary.income_lines]
+            expense_details = [f"{date_str} - {market}: NT$ {format_rent(rent)}"
+                               for date_str, market, rent in summary.expense_lines]
             
             # 顯示結果
             summary_text = f"{selected_person} 的總收支:\n"
-            summary_text += f"收入: NT$ {total_income:,}\n"
-            summary_text += f"支出: NT$ {total_expense:,}\n"
-            summary_text += f"淨收入: NT$ {total_income - total_expense:,}"
+            summary_text += f"收入: NT$ {format_rent(total_income)}\n"
+            summary_text += f"支出: NT$ {format_rent(total_expense)}\n"
+            summary_text += f"淨收入: NT$ {format_rent(total_income - total_expense)}"
             
             self.total_income = total_income
             self.total_expense = total_expense
@@ -176,9 +136,9 @@ class PersonSummaryDialog(QDialog):
             
         try:
             full_text = f"<h1>{selected_person} 的總收支</h1><br>"
-            full_text += f"<p>收入: NT$ {self.total_income:,}</p>"
-            full_text += f"<p>支出: NT$ {self.total_expense:,}</p>"
-            full_text += f"<p>淨收入: NT$ {self.total_income - self.total_expense:,}</p><br>"
+            full_text += f"<p>收入: NT$ {format_rent(self.total_income)}</p>"
+            full_text += f"<p>支出: NT$ {format_rent(self.total_expense)}</p>"
+            full_text += f"<p>淨收入: NT$ {format_rent(self.total_income - self.total_expense)}</p><br>"
             
             full_text += "<h2>收支明細:</h2>"
             full_text += "<table width='100%'><tr>"
@@ -0,0 +1,79 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+FIELD_COUNT = 5
+
+def parse_rent(text):
+    """將 '1,000'、'1000.5' 等租金文字轉為以分為單位的整數，空白或格式錯誤時引發 ValueError"""
+    text = str(text).replace(",", "").strip()
+    try:
+        return int(text) * 100
+    except ValueError:
+        pass
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"租金格式錯誤: {text!r}")
+    if not value.is_finite():
+        raise ValueError(f"租金格式錯誤: {text!r}")
+    return int((value * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def format_rent(cents):
+    """以分為單位的整數轉回租金文字，整數元不顯示小數"""
+    if cents % 100 == 0:
+        return f"{cents // 100:,}"
+    return f"{cents / 100:,.2f}"
+
+class RentEntry:
+    """一筆帳目：市場、租金（分）、所有人、使用人、備註；rent 為 None 表示租金空白或無法解析。
+    owner_id、user_id 為套用名稱綁定後的整數代號，由 LedgerRepository 載入時填入"""
+
+    __slots__ = ("market", "rent", "owner", "user", "note", "owner_id", "user_id")
+
+    def __init__(self, market, rent, owner, user, note=""):
+        self.market = market
+        self.rent = rent
+        self.owner = owner
+        self.user = user
+        self.note = note
+        self.owner_id = -1
+        self.user_id = -1
+
+    @classmethod
+    def from_row(cls, row):
+        """由五個字串的資料列建立；回傳 (entry, 錯誤訊息或 None)"""
+        values = [str(v) for v in row[:FIELD_COUNT]]
+        values.extend([""] * (FIELD_COUNT - len(values)))
+        market, rent_text, owner, user, note = values
+        rent = None
+        error = None
+        if rent_text.strip():
+            try:
+                rent = parse_rent(rent_text)
+            except ValueError as e:
+                error = str(e)
+        return cls(market, rent, owner, user, note), error
+
+    def is_complete(self):
+        """市場、租金、所有人、使用人皆有填寫"""
+        return self.rent is not None and bool(self.market and self.owner and self.user)
+
+    def to_row(self):
+        rent = "" if self.rent is None else format_rent(self.rent).replace(",", "")
+        return [self.market, rent, self.owner, self.user, self.note]
+
+    def __repr__(self):
+        return f"RentEntry({self.market!r}, {self.rent!r}, {self.owner!r}, {self.user!r}, {self.note!r})"
+
+def parse_rows(rows):
+    """一次解析並驗證一天的資料列；回傳 (entries, [(索引, 錯誤訊息)])"""
+    entries = []
+    errors = []
+    for index, row in enumerate(rows):
+        if isinstance(row, list):
+            entry, error = RentEntry.from_row(row)
+        else:
+            entry, error = RentEntry("", None, "", ""), "資料列格式錯誤"
+        entries.append(entry)
+        if error:
+            errors.append((index, error))
+    return entries, errors
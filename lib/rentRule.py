@@ -0,0 +1,106 @@
+from datetime import date, timedelta
+
+class RentRule:
+    """固定位租規則：一列帳目、每週哪幾天（ISO 星期的位元遮罩）、起訖日期與例外日期，
+    只在查詢某段日期時才展開成逐日的資料列"""
+
+    __slots__ = ("rule_id", "row", "weekday_mask", "start", "end", "exceptions")
+
+    def __init__(self, rule_id, row, weekdays, start, end, exceptions=()):
+        self.rule_id = rule_id
+        self.row = [str(v) for v in row]
+        # 第 0 位元為星期一，第 6 位元為星期日
+        self.weekday_mask = 0
+        for weekday in weekdays:
+            self.weekday_mask |= 1 << (int(weekday) - 1)
+        self.start = start
+        self.end = end
+        self.exceptions = set(exceptions)
+
+    @property
+    def weekdays(self):
+        return [i + 1 for i in range(7) if self.weekday_mask >> i & 1]
+
+    @classmethod
+    def from_dict(cls, item):
+        return cls(int(item["id"]), item["row"], item["weekdays"],
+                   date.fromisoformat(item["start"]), date.fromisoformat(item["end"]),
+                   item.get("exceptions", []))
+
+    def to_dict(self):
+        return {
+            "id": self.rule_id,
+            "row": self.row,
+            "weekdays": self.weekdays,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "exceptions": sorted(self.exceptions),
+        }
+
+    def occurs_on(self, day):
+        return (self.start <= day <= self.end
+                and self.weekday_mask >> (day.isoweekday() - 1) & 1
+                and day.isoformat() not in self.exceptions)
+
+    def dates_between(self, start, end):
+        """start 與 end（含）之間規則會產生資料列的日期字串，依時間排序"""
+        lo = max(start, self.start)
+        hi = min(end, self.end)
+        if lo > hi:
+            return []
+        dates = []
+        for weekday in self.weekdays:
+            day = lo + timedelta(days=(weekday - lo.isoweekday()) % 7)
+            while day <= hi:
+                date_str = day.isoformat()
+                if date_str not in self.exceptions:
+                    dates.append(date_str)
+                day += timedelta(days=7)
+        dates.sort()
+        return dates
+
+    def __repr__(self):
+        return f"RentRule({self.rule_id!r}, {self.row!r}, {self.weekdays!r}, {self.start}, {self.end})"
+
+def rules_from_days(days, first_id=1):
+    """將逐日展開的固定位租轉成規則：同一列資料在同一個星期幾每週連續出現兩次以上者合併成一條規則。
+    回傳 (規則, 剩下無法合併的逐日資料)"""
+    runs = {}
+    for date_str in sorted(days):
+        try:
+            day = date.fromisoformat(date_str)
+        except ValueError:
+            continue
+        for row in days[date_str]:
+            if isinstance(row, list):
+                runs.setdefault((tuple(str(v) for v in row), day.isoweekday()), []).append(day)
+
+    rules = []
+    merged = set()
+    for (row, weekday), dates in runs.items():
+        dates = sorted(set(dates))
+        run = [dates[0]]
+        for day in dates[1:] + [None]:
+            if day is not None and (day - run[-1]).days == 7:
+                run.append(day)
+                continue
+            if len(run) >= 2:
+                rules.append(RentRule(first_id + len(rules), row, [weekday], run[0], run[-1]))
+                merged.update((d.isoformat(), row) for d in run)
+            if day is not None:
+                run = [day]
+
+    remaining = {}
+    for date_str, rows in days.items():
+        kept = []
+        consumed = set()
+        for row in rows:
+            key = (date_str, tuple(str(v) for v in row)) if isinstance(row, list) else None
+            # 同一天重複的相同資料列只合併一筆
+            if key in merged and key not in consumed:
+                consumed.add(key)
+                continue
+            kept.append(row)
+        if kept:
+            remaining[date_str] = kept
+    return rules, remaining
@@ -0,0 +1,152 @@
+import os
+from datetime import date, timedelta
+from lib.ledgerStore import DATA_DIR, read_json, open_ledger_store
+from lib.persistWorker import write_json_async, flush_pending_writes
+from lib.ledgerIndex import month_bounds
+from lib.rentRule import RentRule, rules_from_days
+
+RULES_FILE = "fixedRentRules.json"
+
+class RuleLedgerStore:
+    """固定位租的儲存：以規則保存（fixedRentRules.json），讀取某段日期時才展開成逐日資料列，
+    接在原本逐日保存的固定位租後面。原有的逐日資料仍由 base 儲存後端保存"""
+
+    def __init__(self, base, rules_path):
+        self.base = base
+        self.rules_path = rules_path
+        self.rules = {}
+        self.next_id = 1
+        self.load_rules()
+
+    @property
+    def shard_dir(self):
+        return getattr(self.base, "shard_dir", None)
+
+    def load_rules(self):
+        content = read_json(self.rules_path)
+        self.rules = {}
+        for item in content.get("rules", []):
+            try:
+                rule = RentRule.from_dict(item)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"❌ 固定位租規則格式錯誤: {str(e)}")
+                continue
+            self.rules[rule.rule_id] = rule
+        self.next_id = max([content.get("next_id", 1)] + [rule_id + 1 for rule_id in self.rules])
+
+    def save_rules(self):
+        content = {"next_id": self.next_id, "rules": [rule.to_dict() for rule in self.rules.values()]}
+        write_json_async(content, self.rules_path)
+
+    def add_rule(self, row, weekdays, start, end):
+        rule = RentRule(self.next_id, row, weekdays, start, end)
+        self.next_id += 1
+        self.rules[rule.rule_id] = rule
+        self.save_rules()
+        return rule
+
+    def add_exceptions(self, occurrences):
+        """刪除規則在某些日子產生的資料列 [(規則代號, 日期)]，只存檔一次"""
+        for rule_id, date_str in occurrences:
+            self.rules[rule_id].exceptions.add(date_str)
+        self.save_rules()
+
+    def change_rule_from(self, rule_id, day, row):
+        """自 day 起改用新的資料列：原規則結束於前一天，其後另立一條規則；回傳新規則"""
+        rule = self.rules[rule_id]
+        if day <= rule.start:
+            rule.row = [str(v) for v in row]
+            self.save_rules()
+            return rule
+        new_rule = RentRule(self.next_id, row, rule.weekdays, day, rule.end,
+                            [d for d in rule.exceptions if d >= day.isoformat()])
+        self.next_id += 1
+        rule.end = day - timedelta(days=1)
+        rule.exceptions = {d for d in rule.exceptions if d < day.isoformat()}
+        self.rules[new_rule.rule_id] = new_rule
+        self.save_rules()
+        return new_rule
+
+    def end_rule(self, rule_id, day):
+        """規則提前結束於 day（含）；day 早於起始日時整條刪除"""
+        rule = self.rules[rule_id]
+        if day < rule.start:
+            del self.rules[rule_id]
+        else:
+            rule.end = min(rule.end, day)
+        self.save_rules()
+
+    def delete_rule(self, rule_id):
+        del self.rules[rule_id]
+        self.save_rules()
+
+    def rule_ids_on(self, date_str):
+        """某天由規則產生的資料列各自來自哪一條規則，順序與展開的資料列相同"""
+        day = date.fromisoformat(date_str)
+        return [rule_id for rule_id, rule in self.rules.items() if rule.occurs_on(day)]
+
+    def expand(self, days, start, end):
+        """將 start 與 end（含）之間的規則展開，接在逐日資料後面；不改動 base 的資料"""
+        result = {date_str: list(rows) for date_str, rows in days.items()}
+        for rule in self.rules.values():
+            for date_str in rule.dates_between(start, end):
+                result.setdefault(date_str, []).append(list(rule.row))
+        return result
+
+    def load(self):
+        rules = self.rules.values()
+        if not rules:
+            return self.expand(self.base.load(), date.min, date.min)
+        start = min(rule.start for rule in rules)
+        end = max(rule.end for rule in rules)
+        return self.expand(self.base.load(), start, end)
+
+    def load_month(self, year, month):
+        return self.expand(self.base.load_month(year, month), *month_bounds(year, month))
+
+    def _base_rows(self, date_str, rows):
+        """去掉規則展開的資料列，只留下逐日保存的部分"""
+        generated = len(self.rule_ids_on(date_str))
+        return rows[:len(rows) - generated] if generated else rows
+
+    def save_day(self, date_str, rows):
+        self.base.save_day(date_str, self._base_rows(date_str, rows))
+
+    def save(self, data):
+        days = {}
+        for date_str, rows in data.items():
+            rows = self._base_rows(date_str, rows)
+            if rows:
+                days[date_str] = rows
+        self.base.save(days)
+
+    def watch_paths(self):
+        return self.base.watch_paths() + [self.rules_path]
+
+    def invalidate(self, paths):
+        if self.rules_path in paths:
+            self.load_rules()
+            base_paths = [path for path in paths if path != self.rules_path]
+            if base_paths:
+                self.base.invalidate(base_paths)
+            return None
+        return self.base.invalidate(paths)
+
+    def close(self):
+        self.base.close()
+
+def convert_fixed_rents(data_dir=DATA_DIR):
+    """將已逐日展開的固定位租轉成規則，無法合併的資料列仍逐日保存"""
+    rules_path = os.path.join(data_dir, RULES_FILE)
+    store = RuleLedgerStore(open_ledger_store(os.path.join(data_dir, "fixedRentData.json")), rules_path)
+    rules, remaining = rules_from_days(store.base.load(), store.next_id)
+    for rule in rules:
+        store.rules[rule.rule_id] = rule
+        store.next_id = rule.rule_id + 1
+    store.save_rules()
+    store.base.save(remaining)
+    flush_pending_writes()
+    print(f"✅ 已轉換 {len(rules)} 條固定位租規則，剩下 {sum(len(rows) for rows in remaining.values())} 筆逐日資料")
+
+if __name__ == "__main__":
+    convert_fixed_rents()
@@ -0,0 +1,178 @@
+from datetime import date
+from lib.ledgerIndex import month_bounds, months_between
+from lib.rentEntry import format_rent
+
+WEEKDAY_NAMES = "日一二三四五六"
+HEADERS = ["承租日期", "星期", "租位名稱", "租金", "承租日期", "星期", "租位名稱", "租金"]
+SIDE_COLUMNS = 4
+
+class Statement:
+    """一位客戶在一段期間的租金應收付明細：左半邊為客戶承租（客戶為使用人），
+    右半邊為客戶出租（客戶為所有人）。每列為 [日期, 星期, 租位名稱, 租金]，合計以分為單位"""
+
+    __slots__ = ("user", "start", "end", "user_lines", "owner_lines", "user_sum", "owner_sum")
+
+    def __init__(self, user, start, end):
+        self.user = user
+        self.start = start
+        self.end = end
+        self.user_lines = []
+        self.owner_lines = []
+        self.user_sum = 0
+        self.owner_sum = 0
+
+    @property
+    def owner_total(self):
+        """所有人應向客戶收取的淨額，負數表示所有人需支付"""
+        return self.user_sum - self.owner_sum
+
+    def row_count(self):
+        return max(len(self.user_lines), len(self.owner_lines))
+
+    def rows(self):
+        """左右兩側合併成每列八格，較短的一側補空白"""
+        blank = [""] * SIDE_COLUMNS
+        return [(self.user_lines[i] if i < len(self.user_lines) else blank)
+                + (self.owner_lines[i] if i < len(self.owner_lines) else blank)
+                for i in range(self.row_count())]
+
+def statement_line(date_str, entry, resolve_market):
+    entry_date = date.fromisoformat(date_str)
+    return [
+        entry_date.strftime("%Y/%m/%d"),
+        WEEKDAY_NAMES[entry_date.isoweekday() % 7],
+        resolve_market(entry.market),
+        format_rent(entry.rent),
+    ]
+
+def compute_statement(repository, user, start, end, on_chunk=None, on_progress=None, is_cancelled=None):
+    """逐月計算 start 到 end（含）的明細，只計市場、租金、所有人、使用人皆有填寫的資料列。
+    每算完一個月呼叫 on_chunk(承租列, 出租列) 與 on_progress(已完成月數, 總月數)；
+    is_cancelled() 為真時中止並回傳 None"""
+    statement = Statement(user, start, end)
+    months = list(months_between(start, end))
+    for done, (year, month) in enumerate(months, 1):
+        if is_cancelled and is_cancelled():
+            return None
+        first_day, last_day = month_bounds(year, month)
+        full_month = start <= first_day and last_day <= end
+        first_day, last_day = max(first_day, start), min(last_day, end)
+
+        user_lines = []
+        owner_lines = []
+        user_sum = 0
+        owner_sum = 0
+        for date_str, role, entry in repository.party_entries(user, first_day, last_day):
+            if not entry.is_complete():
+                continue
+            line = statement_line(date_str, entry, repository.resolve_market)
+            if role == "user":
+                user_lines.append(line)
+                user_sum += entry.rent
+            else:
+                owner_lines.append(line)
+                owner_sum += entry.rent
+        # 整個月份的合計直接取自月彙總表
+        if full_month:
+            user_sum, owner_sum = repository.statement_totals(user, year, month)
+
+        statement.user_lines.extend(user_lines)
+        statement.owner_lines.extend(owner_lines)
+        statement.user_sum += user_sum
+        statement.owner_sum += owner_sum
+        if on_chunk:
+            on_chunk(user_lines, owner_lines)
+        if on_progress:
+            on_progress(done, len(months))
+    return statement
+
+def batch_statements(repository, owner, year, month):
+    """一次掃描該月的欄位式帳本，產生與 owner 有往來的每位客戶的明細表，
+    明細與合計和逐一開啟 RentSummaryPreview 相同。回傳依名稱排序的 {客戶名稱: Statement}"""
+    first_day, last_day = month_bounds(year, month)
+    ledger = repository.columnar(year, month)
+    resolver = repository.resolver
+    owner_id = resolver.lookup_id(owner)
+    resolve_market = repository.resolve_market
+    statements = {}
+    counterparties = set()
+
+    def statement_for(party_id):
+        statement = statements.get(party_id)
+        if statement is None:
+            statement = statements[party_id] = Statement(resolver.name_of(party_id), first_day, last_day)
+        return statement
+
+    owners = ledger.owners
+    users = ledger.users
+    rents = ledger.rents
+    complete = ledger.complete
+    for i in range(len(ledger)):
+        if not complete[i]:
+            continue
+        owner_of_row, user_of_row = owners[i], users[i]
+        entry_date = ledger.date_of(i)
+        line = [
+            entry_date.strftime("%Y/%m/%d"),
+            WEEKDAY_NAMES[entry_date.isoweekday() % 7],
+            resolve_market(ledger.market_of(i)),
+            format_rent(rents[i]),
+        ]
+        # 同一列兩者皆是時只算使用人
+        statement = statement_for(user_of_row)
+        statement.user_lines.append(line)
+        statement.user_sum += rents[i]
+        if owner_of_row != user_of_row:
+            statement = statement_for(owner_of_row)
+            statement.owner_lines.append(line)
+            statement.owner_sum += rents[i]
+        if owner_of_row == owner_id and user_of_row != owner_id:
+            counterparties.add(user_of_row)
+        elif user_of_row == owner_id and owner_of_row != owner_id:
+            counterparties.add(owner_of_row)
+
+    names = sorted(resolver.name_of(party_id) for party_id in counterparties)
+    by_name = {statement.user: statement for statement in statements.values()}
+    return {name: by_name[name] for name in names}
+
+class PersonSummary:
+    """某人全部月份的收支：所有人為收入、使用人為支出。
+    明細每列為 (日期, 市場名稱, 租金)，租金與合計以分為單位"""
+
+    __slots__ = ("name", "income_lines", "expense_lines", "total_income", "total_expense")
+
+    def __init__(self, name):
+        self.name = name
+        self.income_lines = []
+        self.expense_lines = []
+        self.total_income = 0
+        self.total_expense = 0
+
+    @property
+    def net_income(self):
+        return self.total_income - self.total_expense
+
+def person_summary(repository, name):
+    """PersonSummaryDialog 的計算：合計取自月彙總表，明細取自倒排索引（合併兩個數據源）"""
+    summary = PersonSummary(name)
+    summary.total_expense, summary.total_income = repository.person_totals(name)
+    for date_str, role, entry in repository.party_entries(name):
+        if entry.rent is None:
+            continue
+        # 市場名稱沿用對話框原本的寫法，以名稱綁定解析
+        line = (date_str, repository.resolve_name(entry.market), entry.rent)
+        if role == "user":
+            summary.expense_lines.append(line)
+        else:
+            summary.income_lines.append(line)
+    return summary
+
+def settlement_text(owner, owner_name, user, service_fee, owner_total):
+    """明細表右下角的收付款說明；服務費以元為單位，淨額為零時回傳空字串"""
+    fee = service_fee * 100
+    user_total = -owner_total
+    if user_total > 0:
+        return f"{user}需額外支付服務費：{service_fee} 元\n因此{user}需收到：{format_rent(user_total - fee)} 元, {owner}需支付：{format_rent(user_total - fee)} 元"
+    if owner_total > 0:
+        return f"{user}需額外支付服務費：{service_fee} 元\n因此{owner_name}需收到：{format_rent(owner_total + fee)} 元, {user}需支付：{format_rent(owner_total + fee)} 元"
+    return ""
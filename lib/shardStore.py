@@ -0,0 +1,100 @@
+import os
+from lib.ledgerStore import DATA_DIR, SOURCES, read_json, source_name
+from lib.persistWorker import get_persist_worker, write_json_async, record_own_write
+
+class ShardedLedgerStore:
+    """每月一個檔案的帳本（例如 jsonData/main/2025-03.json），只讀寫用到的月份"""
+
+    def __init__(self, shard_dir):
+        self.shard_dir = shard_dir
+        self.months = {}
+        self.data = None
+
+    def shard_path(self, month_key):
+        return os.path.join(self.shard_dir, f"{month_key}.json")
+
+    def month_keys(self):
+        """目錄中已存在的月份（YYYY-MM），依時間排序"""
+        if not os.path.isdir(self.shard_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.shard_dir) if name.endswith(".json"))
+
+    def shard(self, month_key):
+        if month_key not in self.months:
+            self.months[month_key] = read_json(self.shard_path(month_key))
+        return self.months[month_key]
+
+    def load_month(self, year, month):
+        return self.shard(f"{int(year):04d}-{int(month):02d}")
+
+    def load(self):
+        if self.data is None:
+            self.data = {}
+            for month_key in self.month_keys():
+                self.data.update(self.shard(month_key))
+        return self.data
+
+    def save_day(self, date_str, rows):
+        """只改寫該日所屬月份的分片"""
+        month_key = date_str[:7]
+        shard = self.shard(month_key)
+        shard[date_str] = rows
+        if self.data is not None:
+            self.data[date_str] = rows
+        write_json_async(shard, self.shard_path(month_key))
+
+    def save(self, data):
+        grouped = {}
+        for date_str, rows in data.items():
+            grouped.setdefault(date_str[:7], {})[date_str] = rows
+        for month_key in self.month_keys():
+            if month_key not in grouped:
+                path = self.shard_path(month_key)
+                get_persist_worker().submit(lambda path=path: (os.remove(path), record_own_write(path)),
+                                            key=os.path.normpath(path))
+        for month_key, shard in grouped.items():
+            write_json_async(shard, self.shard_path(month_key))
+        self.months = grouped
+        self.data = data
+
+    def watch_paths(self):
+        return [self.shard_path(month_key) for month_key in self.month_keys()]
+
+    def invalidate(self, paths):
+        """只丟棄有變動的月份分片"""
+        months = {os.path.basename(path)[:-5] for path in paths}
+        for month_key in months:
+            self.months.pop(month_key, None)
+        self.data = None
+        return months
+
+    def close(self):
+        pass
+
+def shard_dir_for(path):
+    """mainData.json 對應 jsonData/main/，fixedRentData.json 對應 jsonData/fixed/"""
+    return os.path.join(os.path.dirname(path), source_name(path))
+
+def split_json_file(path):
+    """將整份帳本（含未壓縮的日誌）拆成月份分片，原檔改名為 .bak 保留"""
+    from lib.journalStore import JournalLedgerStore
+    journal_store = JournalLedgerStore(path)
+    data = journal_store.load()
+    store = ShardedLedgerStore(shard_dir_for(path))
+    store.save(data)
+    get_persist_worker().flush()
+    if os.path.exists(journal_store.journal_path):
+        os.remove(journal_store.journal_path)
+    if os.path.exists(path):
+        os.replace(path, f"{path}.bak")
+    print(f"✅ 已拆分 {path}：{len(store.months)} 個月份")
+    return store
+
+def split_json_files(data_dir=DATA_DIR):
+    for file_name in SOURCES:
+        path = os.path.join(data_dir, file_name)
+        if os.path.exists(path):
+            split_json_file(path)
+
+if __name__ == "__main__":
+    split_json_files()
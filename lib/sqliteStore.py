@@ -0,0 +1,121 @@
+import os
+import sqlite3
+from lib.ledgerStore import DATA_DIR, SQLITE_NAME, SOURCES, read_json
+from lib.persistWorker import record_own_write
+
+FIELD_COUNT = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    market TEXT NOT NULL DEFAULT '',
+    rent TEXT NOT NULL DEFAULT '',
+    owner TEXT NOT NULL DEFAULT '',
+    user TEXT NOT NULL DEFAULT '',
+    note TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (source, date, seq)
+) WITHOUT ROWID;
+"""
+
+def _pad(row):
+    """補齊或截斷為五個欄位（市場、租金、所有人、使用人、備註）"""
+    values = [str(v) for v in row[:FIELD_COUNT]]
+    values.extend([""] * (FIELD_COUNT - len(values)))
+    return values
+
+class SqliteLedgerStore:
+    """以SQLite儲存帳目，依 (來源, 日期) 建立索引，每次只寫入單日資料"""
+
+    def __init__(self, db_path, source):
+        self.db_path = db_path
+        self.source = source
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.data = None
+
+    def load(self):
+        if self.data is None:
+            self.data = {}
+            cursor = self.conn.execute(
+                "SELECT date, market, rent, owner, user, note FROM entries "
+                "WHERE source = ? ORDER BY date, seq",
+                (self.source,))
+            for date_str, *row in cursor:
+                self.data.setdefault(date_str, []).append(row)
+        return self.data
+
+    def load_month(self, year, month):
+        """以 (source, date) 主鍵做範圍查詢，只讀出該月份的資料"""
+        if self.data is not None:
+            prefix = f"{int(year):04d}-{int(month):02d}-"
+            return {date_str: rows for date_str, rows in self.data.items() if date_str.startswith(prefix)}
+        start = f"{int(year):04d}-{int(month):02d}-00"
+        end = f"{int(year):04d}-{int(month):02d}-99"
+        month_data = {}
+        cursor = self.conn.execute(
+            "SELECT date, market, rent, owner, user, note FROM entries "
+            "WHERE source = ? AND date BETWEEN ? AND ? ORDER BY date, seq",
+            (self.source, start, end))
+        for date_str, *row in cursor:
+            month_data.setdefault(date_str, []).append(row)
+        return month_data
+
+    def _write_day(self, date_str, rows):
+        self.conn.execute("DELETE FROM entries WHERE source = ? AND date = ?",
+                          (self.source, date_str))
+        self.conn.executemany(
+            "INSERT INTO entries (source, date, seq, market, rent, owner, user, note) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(self.source, date_str, seq, *_pad(row)) for seq, row in enumerate(rows)])
+
+    def save_day(self, date_str, rows):
+        """單一交易內只改寫該日的資料列；尚未整份讀入時不為存檔而讀取全部資料"""
+        if self.data is not None:
+            self.data[date_str] = rows
+        with self.conn:
+            self._write_day(date_str, rows)
+        self.record_own_write()
+
+    def save(self, data):
+        self.data = data
+        with self.conn:
+            self.conn.execute("DELETE FROM entries WHERE source = ?", (self.source,))
+            for date_str, rows in data.items():
+                self._write_day(date_str, rows)
+        self.record_own_write()
+
+    def record_own_write(self):
+        for path in self.watch_paths():
+            record_own_write(path)
+
+    def watch_paths(self):
+        return [self.db_path, f"{self.db_path}-wal"]
+
+    def invalidate(self, paths):
+        self.data = None
+        return None
+
+    def close(self):
+        self.conn.close()
+
+def import_json_files(data_dir=DATA_DIR):
+    """一次性匯入：將 mainData.json 與 fixedRentData.json 轉入SQLite資料庫"""
+    db_path = os.path.join(data_dir, SQLITE_NAME)
+    for file_name, source in SOURCES.items():
+        json_path = os.path.join(data_dir, file_name)
+        if not os.path.exists(json_path):
+            continue
+        store = SqliteLedgerStore(db_path, source)
+        data = read_json(json_path)
+        store.save(data)
+        store.close()
+        count = sum(len(rows) for rows in data.values())
+        print(f"✅ 已匯入 {json_path}：{len(data)} 天，{count} 筆")
+    return db_path
+
+if __name__ == "__main__":
+    import_json_files()
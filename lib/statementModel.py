@@ -0,0 +1,50 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from lib.settlement import HEADERS, SIDE_COLUMNS
+
+class StatementTableModel(QAbstractTableModel):
+    """明細表的唯讀模型：左四欄為客戶承租、右四欄為客戶出租，
+    直接引用計算出的資料列，顯示時才在 data() 取值，不為每格建立物件"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sides = ([], [])
+
+    def append_lines(self, user_lines, owner_lines):
+        """加入背景計算送來的一批資料列"""
+        old_count = self.rowCount()
+        old_lengths = [len(lines) for lines in self.sides]
+        new_count = max(old_lengths[0] + len(user_lines), old_lengths[1] + len(owner_lines))
+        if new_count > old_count:
+            self.beginInsertRows(QModelIndex(), old_count, new_count - 1)
+        self.sides[0].extend(user_lines)
+        self.sides[1].extend(owner_lines)
+        if new_count > old_count:
+            self.endInsertRows()
+        # 較短的一側補進既有的列時通知畫面更新
+        first = min(old_lengths)
+        if first < old_count:
+            self.dataChanged.emit(self.index(first, 0), self.index(old_count - 1, len(HEADERS) - 1))
+
+    def text(self, row, column):
+        lines = self.sides[column // SIDE_COLUMNS]
+        return lines[row][column % SIDE_COLUMNS] if row < len(lines) else ""
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else max(len(self.sides[0]), len(self.sides[1]))
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.text(index.row(), index.column())
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
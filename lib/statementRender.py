@@ -0,0 +1,95 @@
+import re
+from html import escape
+from lib.ledgerIndex import month_bounds
+from lib.settlement import HEADERS, batch_statements, settlement_text
+
+PAGE_BREAK = "<div style='page-break-after:always;'></div>"
+# 路徑分隔符號與 Windows 檔名不可使用的字元
+UNSAFE_FILE_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+def statement_html(owner_name, user_name, date_range, print_date, rows, diff_text):
+    """明細表的列印用 HTML；rows 為每列八格的資料，diff_text 為收付款說明。
+    名稱等文字可能含有 <、&，插入 HTML 前一律跳脫"""
+    owner_name, user_name, date_range, print_date = map(escape, (owner_name, user_name, date_range, print_date))
+    diff_text = escape(diff_text).replace("\n", "&nbsp;&nbsp;&nbsp;&nbsp;")
+
+    # HTML 開頭
+    parts = [f"""
+        <div style="text-align:center; font-size:20pt; font-weight:bold; margin-bottom:10px;">
+            {owner_name} 租金應收付明細表
+        </div>
+
+        <!-- 資訊欄 -->
+        <div style="text-align:center; font-size:10pt; margin-bottom:20px;">
+            <span><b>客戶名稱：</b>{user_name}</span>
+            &nbsp;&nbsp;&nbsp;&nbsp;
+            <span><b>起始日期：</b>{date_range}</span>
+            &nbsp;&nbsp;&nbsp;&nbsp;
+            <span><b>列印日期：</b>{print_date}</span>
+        </div>
+
+        <!-- 表格開始 -->
+        <div style="text-align:center;">
+        <table border='1' cellspacing='0' cellpadding='6'
+            style='margin:auto; font-size:11pt; border-collapse:collapse; width:90%; text-align:center;'>
+            <thead>
+                <tr style='background-color:#f0f0f0;'>
+        """]
+
+    # 加入欄位名稱
+    parts.extend(f"<th style='text-align:center;'>{header}</th>" for header in HEADERS)
+    parts.append("</tr></thead><tbody>")
+
+    # 加入表格資料
+    for row in rows:
+        parts.append("<tr>")
+        parts.extend(f"<td style='text-align:center;'>{escape(text)}</td>" for text in row)
+        parts.append("</tr>")
+    parts.append("</tbody></table></div>")
+
+    # 收付款說明（右下角）
+    parts.append(f"""
+        <div style="width:90%; font-size:10pt; text-align:right; margin-top:30px; margin-left:auto; margin-right:auto;">
+            {diff_text}
+        </div>
+        """)
+    return "".join(parts)
+
+def statement_file_names(month_key, names):
+    """每位客戶明細表的檔名（不含副檔名）{年-月}_{客戶名稱}。名稱中的不合法字元換成底線，
+    確保檔案只寫在選定的資料夾內；換完後重複的檔名加上序號，不互相覆蓋"""
+    used = set()
+    file_names = []
+    for name in names:
+        stem = f"{month_key}_{UNSAFE_FILE_CHARS.sub('_', name).rstrip(' .')}"
+        file_name = stem
+        count = 2
+        # Windows 的檔名不分大小寫
+        while file_name.lower() in used:
+            file_name = f"{stem}_{count}"
+            count += 1
+        used.add(file_name.lower())
+        file_names.append(file_name)
+    return file_names
+
+def combine_for_print(htmls):
+    """多份明細表合併成一份文件，每份從新的一頁開始，只需開一次列印對話框"""
+    return PAGE_BREAK.join(htmls)
+
+def statement_jobs(repository, owner, year, month, service_fee, print_date):
+    """某位所有人當月所有客戶的明細表，一次掃描計算。
+    回傳 [(客戶名稱, Statement, job)]，job 為 statement_html 與 PDF 共用的參數"""
+    first_day, last_day = month_bounds(year, month)
+    date_range = f"{first_day.strftime('%Y/%m/%d')} 到 {last_day.strftime('%Y/%m/%d')}"
+    owner_name = repository.resolve_name(owner)
+    jobs = []
+    for name, statement in batch_statements(repository, owner, year, month).items():
+        text = settlement_text(owner, owner_name, name, service_fee, statement.owner_total)
+        jobs.append((name, statement, (owner_name, name, date_range, print_date, statement.rows(), text)))
+    return jobs
+
+def batch_documents(repository, owner, year, month, service_fee, print_date):
+    """statement_jobs 再逐份產生 HTML（只是字串串接，開行程反而較慢）。
+    回傳 [(客戶名稱, Statement, job, HTML)]，收付款說明為 job[-1]"""
+    return [(name, statement, job, statement_html(*job))
+            for name, statement, job in statement_jobs(repository, owner, year, month, service_fee, print_date)]
@@ -0,0 +1,65 @@
+import threading
+from PySide6.QtCore import QObject, QRunnable, Signal
+from lib.settlement import compute_statement
+from lib.statementRender import batch_documents
+
+class StatementSignals(QObject):
+    chunk = Signal(list, list)
+    progress = Signal(int, int)
+    finished = Signal(object)
+    cancelled = Signal()
+    failed = Signal(str)
+
+class StatementWorker(QRunnable):
+    """在 QThreadPool 中計算明細表，每算完一個月送出部分結果與進度，畫面不必等待"""
+
+    def __init__(self, repository, user, start, end):
+        super().__init__()
+        self.repository = repository
+        self.user = user
+        self.start = start
+        self.end = end
+        self.signals = StatementSignals()
+        self.cancel_event = threading.Event()
+        # 由對話框保留參照，避免執行完後被 Qt 刪除而收不到最後的訊號
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            statement = compute_statement(
+                self.repository, self.user, self.start, self.end,
+                on_chunk=self.signals.chunk.emit,
+                on_progress=self.signals.progress.emit,
+                is_cancelled=self.cancel_event.is_set,
+            )
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        if statement is None:
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(statement)
+
+class BatchSignals(QObject):
+    finished = Signal(object)
+    failed = Signal(str)
+
+class BatchStatementWorker(QRunnable):
+    """在背景產生某位所有人當月所有客戶的明細表"""
+
+    def __init__(self, repository, owner, year, month, service_fee, print_date):
+        super().__init__()
+        self.args = (repository, owner, year, month, service_fee, print_date)
+        self.signals = BatchSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            documents = batch_documents(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(documents)
@@ -1,9 +1,11 @@
 import sys
 from lib.mainWindow import MainWindow
+from lib.ledgerStore import close_ledger_stores
 from PySide6.QtWidgets import QApplication
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(close_ledger_stores)
     window = MainWindow()
     window.show()
     sys.exit(app.exec())